@@ -1,43 +1,46 @@
 import os
 import logging
+import pickle
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
-from pydantic import field_validator, HttpUrl, Field, ValidationInfo
-from pydantic_settings import BaseSettings
+from pydantic import BaseModel, field_validator, HttpUrl, Field, ValidationInfo
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Dict, Optional
 from urllib.parse import urlparse
 
+logger = logging.getLogger(__name__)
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 def load_environment():
     try:
         env_path = BASE_DIR / '.env'
-        if not env_path.exists():
-            logging.warning(f".env file not found at {env_path}, using defaults")
-            return
-            
+        # load_dotenv is a no-op for a missing file; skip the extra stat
         load_dotenv(env_path)
-        logging.info("Environment variables loaded successfully")
+        logger.info("Environment variables loaded successfully")
         
     except Exception as e:
-        logging.error(f"Error loading .env file: {str(e)}")
-        logging.warning("Using default configuration values")
-        
-load_environment()
+        logger.error("Error loading .env file: %s", e)
+        logger.warning("Using default configuration values")
+
+SETTINGS_CACHE_PATH = BASE_DIR / '.env.cache.pkl'
+
+VALID_LOG_LEVELS = frozenset({"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"})
+
+@lru_cache(maxsize=4)
+def _parse_url(url_str: str):
+    """urlparse is surprisingly costly; the same URL is validated on every
+    Settings construction, so cache the split result"""
+    return urlparse(url_str)
 
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_FILE = os.path.join(BASE_DIR, "logs", "app.log")
 
 os.makedirs(os.path.join(BASE_DIR, "logs"), exist_ok=True)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format=LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+# Handler setup lives in Application._setup_logging; configuring here as
+# well registered duplicate handlers and wrote every record twice
 
 CHAT_HISTORY_WIDTH = "20%"
 MAIN_PANEL_WIDTH = "80%"
@@ -49,19 +52,21 @@ SEARCH_TYPES = {
     "COMPLETION": "Generate contextual responses"
 }
 
-class RetryConfig(BaseSettings):
+# Plain models: these are populated through Settings' nested env delimiter
+# and don't need their own env-file scan per instantiation
+class RetryConfig(BaseModel):
     max_retries: int = 3
     retry_delay: float = 0.5
     retry_backoff: float = 2.0
     retry_max_delay: float = 10.0
 
-class TimeoutConfig(BaseSettings):
+class TimeoutConfig(BaseModel):
     connect_timeout: float = 5.0
     read_timeout: float = 30.0
     write_timeout: float = 30.0
     pool_timeout: float = 30.0
 
-class PaginationConfig(BaseSettings):
+class PaginationConfig(BaseModel):
     chat_history_page_size: int = 50
     max_history_pages: int = 100
     default_page: int = 1
@@ -115,7 +120,7 @@ class Settings(BaseSettings):
     def validate_api_url(cls, v, info: ValidationInfo):
         if not v:
             raise ValueError("API_BASE_URL is required")
-        parsed = urlparse(str(v))
+        parsed = _parse_url(str(v))
         if not all([parsed.scheme, parsed.netloc]):
             raise ValueError("API_BASE_URL must be a valid HTTP(S) URL")
         if parsed.scheme not in ("http", "https"):
@@ -124,9 +129,8 @@ class Settings(BaseSettings):
 
     @field_validator("LOG_LEVEL")
     def validate_log_level(cls, v, info: ValidationInfo):
-        valid_levels = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
-        if v not in valid_levels:
-            raise ValueError(f"Invalid log level. Must be one of: {', '.join(valid_levels)}")
+        if v not in VALID_LOG_LEVELS:
+            raise ValueError(f"Invalid log level. Must be one of: {', '.join(VALID_LOG_LEVELS)}")
         return v
 
     @field_validator("MAX_DB_CONNECTIONS")
@@ -144,19 +148,52 @@ class Settings(BaseSettings):
     @field_validator("DATABASE_PATH")
     def validate_database_path(cls, v, info: ValidationInfo):
         path = Path(v)
-        if not path.parent.exists():
-            path.parent.mkdir(parents=True)
+        path.parent.mkdir(parents=True, exist_ok=True)
         return path
 
-    @field_validator("*")
-    def validate_not_none(cls, v, info: ValidationInfo):
-        if v is None and not info.field.allow_none:
-            raise ValueError(f"{info.field.name} cannot be None")
-        return v
-    
-    class Config:
-        env_file = ".env"
-        env_nested_delimiter = "__"
-        validate_default = True
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_nested_delimiter="__",
+        # Defaults above are already well-formed; skip re-validating them
+        validate_default=False
+    )
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def _load_settings() -> Settings:
+    """Load settings, short-circuiting dotenv parsing with a sidecar cache
+    of the parsed .env delta keyed by the file's mtime. Only the raw
+    key/value delta is cached — the Settings object is rebuilt on every
+    start, so a schema change can never resurface through a stale pickle"""
+    env_path = BASE_DIR / '.env'
+    try:
+        env_mtime = os.stat(env_path).st_mtime
+    except OSError:
+        env_mtime = None
+
+    if env_mtime is not None:
+        try:
+            with open(SETTINGS_CACHE_PATH, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get("env_mtime") == env_mtime:
+                os.environ.update(cached["env_delta"])
+                return Settings()
+        except Exception:
+            pass  # stale or unreadable cache: fall through to a full load
+
+    env_before = dict(os.environ)
+    load_environment()
+    env_delta = {k: v for k, v in os.environ.items() if env_before.get(k) != v}
+    loaded = Settings()
+
+    if env_mtime is not None:
+        try:
+            # The delta mirrors .env, secrets included: owner-only file
+            fd = os.open(SETTINGS_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({"env_mtime": env_mtime, "env_delta": env_delta}, f)
+        except Exception as e:
+            logger.warning("Could not write settings cache: %s", e)
+
+    return loaded
+
+settings = _load_settings()
\ No newline at end of file
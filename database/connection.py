@@ -3,16 +3,31 @@ import time
 import logging
 import asyncio
 from contextlib import asynccontextmanager
-from typing import Dict, Set
+from typing import Dict
 from modules.exceptions import DatabaseError
 from config.settings import settings
 from modules.metrics import Metrics
 from modules.validation import validate_input
 
+# Per-connection tuning: WAL lets readers proceed while the writer commits,
+# NORMAL sync is safe in WAL mode, and temp structures stay in memory.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=memory",
+    "PRAGMA foreign_keys=ON",
+)
+
 class DatabasePool:
+    """Connection pool following SQLite's concurrency model: one writer plus
+    N readers. Read and write connections live in separate queues so readers
+    never wait behind the writer."""
+
     def __init__(self, db_path: str = str(settings.DATABASE_PATH), max_connections: int = 5, timeout: int = 30):
         self.logger = logging.getLogger(__name__)
-        
+
         validate_input({
             "db_path": db_path,
             "max_connections": max_connections,
@@ -22,15 +37,23 @@ class DatabasePool:
             "max_connections": int,
             "timeout": int
         })
-        
+
         self.db_path = db_path
         self.max_connections = max_connections
         self.timeout = timeout
-        self._lock = asyncio.Lock()
-        self._connection_queue = asyncio.Queue(maxsize=max_connections)
-        self._active_connections: Set[sqlite3.Connection] = set()
+        # One capacity primitive per side: the semaphore caps checked-out
+        # connections, the queue holds the idle ones. No lock, no set.
+        self._read_pool_size = max(1, max_connections - 1)
+        self._write_pool_size = 1
+        self._read_queue = asyncio.Queue(maxsize=self._read_pool_size)
+        self._write_queue = asyncio.Queue(maxsize=self._write_pool_size)
+        self._read_semaphore = asyncio.Semaphore(self._read_pool_size)
+        self._write_semaphore = asyncio.Semaphore(self._write_pool_size)
+        self._in_use = 0
+        self._validation_task = None
+        self._sweep_count = 0
         self.metrics = Metrics()
-        
+
         # Initialize metrics
         self._metrics = {
             "total_connections": 0,
@@ -39,15 +62,23 @@ class DatabasePool:
             "timeouts": 0
         }
 
-    def _create_connection(self) -> sqlite3.Connection:
-        """Create a new database connection"""
+    def _create_connection(self, readonly: bool = True) -> sqlite3.Connection:
+        """Create a new database connection with per-connection PRAGMAs"""
         try:
             conn = sqlite3.connect(
                 self.db_path,
                 timeout=self.timeout,
-                check_same_thread=False
+                check_same_thread=False,
+                # No implicit transaction state machine: write paths issue
+                # BEGIN IMMEDIATE ... COMMIT themselves, read paths run in
+                # autocommit. The larger statement cache keeps the repeated
+                # chat/repository INSERT/SELECTs compiled.
+                isolation_level=None,
+                cached_statements=256
             )
             conn.row_factory = sqlite3.Row
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
             return conn
         except sqlite3.Error as e:
             self.logger.error(f"Failed to create connection: {str(e)}")
@@ -63,123 +94,175 @@ class DatabasePool:
         except sqlite3.Error:
             return False
 
-    async def get_connection(self) -> sqlite3.Connection:
+    def _pool_for(self, readonly: bool):
+        if readonly:
+            return self._read_queue, self._read_semaphore
+        return self._write_queue, self._write_semaphore
+
+    async def get_connection(self, readonly: bool = True) -> sqlite3.Connection:
         """Get a database connection from the pool"""
-        async with self._lock:
+        queue, semaphore = self._pool_for(readonly)
+        try:
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                self._metrics["timeouts"] += 1
+                raise DatabaseError("Timed out waiting for a connection")
+
+            # A permit is held: either an idle connection is queued or we
+            # are under the cap and may create one. Local SQLite
+            # connections don't go stale the way network ones do, so
+            # liveness checking is left to the periodic sweep and to lazy
+            # failure in get_db_connection.
             try:
-                # Try to get connection from queue
+                conn = queue.get_nowait()
+            except asyncio.QueueEmpty:
                 try:
-                    conn = await asyncio.wait_for(
-                        self._connection_queue.get(),
-                        timeout=self.timeout
-                    )
-                    if self._validate_connection_sync(conn):
-                        await self.metrics.increment("connection_success")
-                        return conn
-                    else:
-                        await self._close_connection(conn)
-                except asyncio.TimeoutError:
-                    self._metrics["timeouts"] += 1
-
-                # Create new connection if under limit
-                if len(self._active_connections) < self.max_connections:
-                    conn = await asyncio.to_thread(self._create_connection)
-                    self._active_connections.add(conn)
-                    self._metrics["total_connections"] += 1
-                    await self.metrics.increment("connection_success")
-                    return conn
-                
-                raise DatabaseError("Maximum connections reached")
+                    # Opening a local SQLite file is sub-millisecond; a
+                    # to_thread round-trip costs more than the connect itself
+                    conn = self._create_connection(readonly)
+                except Exception:
+                    semaphore.release()
+                    raise
+                self._metrics["total_connections"] += 1
 
-            except Exception as e:
-                await self.metrics.increment("connection_errors")
-                self.logger.error(f"Error getting connection: {str(e)}")
-                raise DatabaseError(f"Failed to get connection: {str(e)}")
+            self._in_use += 1
+            self.metrics.increment("connection_success")
+            return conn
 
-    async def return_connection(self, conn: sqlite3.Connection) -> None:
+        except DatabaseError:
+            self.metrics.increment("connection_errors")
+            raise
+        except Exception as e:
+            self.metrics.increment("connection_errors")
+            self.logger.error(f"Error getting connection: {str(e)}")
+            raise DatabaseError(f"Failed to get connection: {str(e)}")
+
+    async def return_connection(self, conn: sqlite3.Connection, readonly: bool = True) -> None:
         """Return a connection to the pool"""
-        async with self._lock:
-            if conn in self._active_connections:
-                try:
-                    await self._connection_queue.put(conn)
-                    await self.metrics.increment("connection_return_success")
-                except asyncio.QueueFull:
-                    await self._close_connection(conn)
-                    await self.metrics.increment("connection_return_errors")
-
-    async def _close_connection(self, conn: sqlite3.Connection):
-        """Close a connection"""
+        queue, semaphore = self._pool_for(readonly)
+        # Cheap no-op unless enough has changed to warrant fresh
+        # planner statistics (per SQLite's recommendation on release)
+        try:
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        queue.put_nowait(conn)
+        self._in_use -= 1
+        semaphore.release()
+        self.metrics.increment("connection_return_success")
+
+    async def _close_connection(self, conn: sqlite3.Connection, readonly: bool = True):
+        """Close a checked-out connection and free its permit"""
+        _, semaphore = self._pool_for(readonly)
         try:
             conn.close()
         except Exception as e:
             self.logger.error(f"Error closing connection: {e}")
         finally:
-            self._active_connections.discard(conn)
+            self._in_use -= 1
+            semaphore.release()
 
     async def close_all(self) -> None:
         """Close all connections in the pool"""
-        async with self._lock:
-            while not self._connection_queue.empty():
+        if self._validation_task and not self._validation_task.done():
+            self._validation_task.cancel()
+        for queue in (self._read_queue, self._write_queue):
+            while True:
                 try:
-                    conn = await self._connection_queue.get_nowait()
-                    conn.close()
+                    conn = queue.get_nowait()
                 except asyncio.QueueEmpty:
                     break
-            
-            for conn in list(self._active_connections):
                 try:
                     conn.close()
                 except Exception:
                     pass
-            self._active_connections.clear()
 
     def get_metrics(self) -> Dict[str, int]:
         """Get pool metrics"""
         return {
             **self._metrics,
-            "current_active": len(self._active_connections),
-            "queue_size": self._connection_queue.qsize()
+            "current_active": self._in_use,
+            "queue_size": self._read_queue.qsize() + self._write_queue.qsize()
         }
 
     async def validate_connections(self) -> None:
-        """Validate all connections in the pool"""
-        async with self._lock:
-            invalid_connections = []
-            for conn in self._active_connections:
-                if not self._validate_connection_sync(conn):
-                    invalid_connections.append(conn)
-            
-            for conn in invalid_connections:
-                await self._close_connection(conn)
-                self._metrics["connection_errors"] += 1
-
-            while len(self._active_connections) < self.max_connections:
+        """Validate all idle connections in the pool"""
+        for readonly in (True, False):
+            queue, _ = self._pool_for(readonly)
+            idle = []
+            while True:
                 try:
-                    conn = self._create_connection()
-                    if self._validate_connection_sync(conn):
-                        self._active_connections.add(conn)
-                        self._metrics["total_connections"] += 1
-                except Exception as e:
-                    self.logger.error(f"Error creating new connection: {str(e)}")
+                    idle.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
                     break
 
-# Create global pool instance
-pool = DatabasePool(str(settings.DATABASE_PATH))
+            for conn in idle:
+                if self._validate_connection_sync(conn):
+                    queue.put_nowait(conn)
+                else:
+                    # Idle connections hold no permit; just close them
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    self._metrics["connection_errors"] += 1
+
+    def start_periodic_validation(self, interval: int = settings.CLEANUP_INTERVAL) -> None:
+        """Start the background sweep over idle connections"""
+        if self._validation_task and not self._validation_task.done():
+            return
+        self._validation_task = asyncio.create_task(self._periodic_validation(interval))
+
+    async def _periodic_validation(self, interval: int) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.validate_connections()
+                self._sweep_count += 1
+                # Keep the WAL bounded and reclaim free pages occasionally
+                if self._sweep_count % 5 == 0:
+                    await self._checkpoint_wal()
+            except Exception as e:
+                self.logger.error(f"Error validating connections: {str(e)}")
+
+    async def _checkpoint_wal(self) -> None:
+        """Truncate the WAL and run incremental vacuum on the writer"""
+        conn = await self.get_connection(readonly=False)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("PRAGMA incremental_vacuum")
+        finally:
+            await self.return_connection(conn, readonly=False)
+
+# Global pool instance: every get_db_connection call goes through this,
+# so validation sweeps and shutdown must target it, not a second pool
+pool = DatabasePool(
+    str(settings.DATABASE_PATH),
+    max_connections=settings.MAX_DB_CONNECTIONS,
+    timeout=settings.DB_TIMEOUT
+)
 
 @asynccontextmanager
-async def get_db_connection(max_retries: int = 3, retry_delay: float = 0.5):
+async def get_db_connection(readonly: bool = True, max_retries: int = 3, retry_delay: float = 0.5):
     """Async context manager for database connections"""
     conn = None
+    for attempt in range(max_retries):
+        try:
+            conn = await pool.get_connection(readonly)
+            break
+        except Exception as e:
+            if attempt == max_retries - 1:
+                raise DatabaseError(f"Failed to get connection after {max_retries} attempts: {str(e)}")
+            await asyncio.sleep(retry_delay)
     try:
-        for attempt in range(max_retries):
-            try:
-                conn = await pool.get_connection()
-                yield conn
-                break
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    raise DatabaseError(f"Failed to get connection after {max_retries} attempts: {str(e)}")
-                await asyncio.sleep(retry_delay)
+        yield conn
+    except sqlite3.OperationalError:
+        # Stale connection surfaced lazily: drop it so the pool recreates
+        # one on the next acquire instead of health-checking every borrow
+        await pool._close_connection(conn, readonly)
+        conn = None
+        raise
     finally:
         if conn:
-            await pool.return_connection(conn)
\ No newline at end of file
+            await pool.return_connection(conn, readonly)
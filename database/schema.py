@@ -4,6 +4,11 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
+logger = logging.getLogger(__name__)
+
+# Bump whenever CREATE_TABLES_SQL changes so existing databases re-run it
+SCHEMA_VERSION = 7
+
 CREATE_TABLES_SQL = """
 -- Enable foreign key support
 PRAGMA foreign_keys = ON;
@@ -27,11 +32,21 @@ CREATE TABLE IF NOT EXISTS chat_history (
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     search_type TEXT NOT NULL,
-    repository_ids TEXT, -- Comma-separated list of dataset_ids
     parent_id TEXT,
+    thread_position INTEGER DEFAULT 0,
+    reply_count INTEGER DEFAULT 0, -- maintained by save_message, not a correlated subquery
     FOREIGN KEY (parent_id) REFERENCES chat_history(id) ON DELETE CASCADE
 );
 
+-- Normalized message <-> repository link table; the relation used to be
+-- a CSV repository_ids column on chat_history (dropped in v7)
+CREATE TABLE IF NOT EXISTS chat_history_repositories (
+    chat_id TEXT NOT NULL,
+    dataset_id TEXT NOT NULL,
+    PRIMARY KEY (chat_id, dataset_id),
+    FOREIGN KEY (chat_id) REFERENCES chat_history(id) ON DELETE CASCADE
+);
+
 CREATE TABLE IF NOT EXISTS user_preferences (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     key TEXT NOT NULL UNIQUE,
@@ -40,58 +55,115 @@ CREATE TABLE IF NOT EXISTS user_preferences (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Indexes
-CREATE INDEX IF NOT EXISTS idx_chat_history_repository_ids ON chat_history(repository_ids);
+-- Indexes. SQLite uses one index per table per query, so the common
+-- "filter + ORDER BY created_at DESC" patterns get composite indexes
+-- instead of single-column ones.
 CREATE INDEX IF NOT EXISTS idx_chat_history_created_at ON chat_history(created_at);
-CREATE INDEX IF NOT EXISTS idx_chat_history_user ON chat_history(user);
-CREATE INDEX IF NOT EXISTS idx_chat_history_search_type ON chat_history(search_type);
+CREATE INDEX IF NOT EXISTS idx_chat_history_user_created ON chat_history(user, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_chat_history_search_created ON chat_history(search_type, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_chr_dataset ON chat_history_repositories(dataset_id, chat_id);
+-- Thread-ordered pagination seeks this expression index instead of
+-- sorting the whole table
+CREATE INDEX IF NOT EXISTS idx_chat_history_thread ON chat_history(COALESCE(parent_id, id), thread_position);
 CREATE INDEX IF NOT EXISTS idx_repositories_status ON repositories(status);
 CREATE INDEX IF NOT EXISTS idx_repositories_is_active ON repositories(is_active);
 CREATE INDEX IF NOT EXISTS idx_repositories_url ON repositories(url);
 CREATE INDEX IF NOT EXISTS idx_repositories_updated_at ON repositories(updated_at);
 CREATE INDEX IF NOT EXISTS idx_chat_history_updated_at ON chat_history(updated_at);
 
--- Triggers for updated_at timestamps
-CREATE TRIGGER IF NOT EXISTS repositories_updated_at 
-    AFTER UPDATE ON repositories
-BEGIN
-    UPDATE repositories SET updated_at = CURRENT_TIMESTAMP WHERE dataset_id = NEW.dataset_id;
-END;
-
-CREATE TRIGGER IF NOT EXISTS chat_history_updated_at 
-    AFTER UPDATE ON chat_history
-BEGIN
-    UPDATE chat_history SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-END;
-
-CREATE TRIGGER IF NOT EXISTS user_preferences_updated_at 
-    AFTER UPDATE ON user_preferences
-BEGIN
-    UPDATE user_preferences SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-END;
+-- updated_at is maintained by the managers' UPDATE statements directly;
+-- trigger-based maintenance doubled every write with a recursive UPDATE
 """
 
 def init_database(db_path: str):
     """Initialize database with required tables"""
+    conn = None
     try:
         conn = sqlite3.connect(db_path)
-        
-        # Enable foreign keys
+
+        # Schema already current: skip parsing the whole creation script
+        current_version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if current_version == SCHEMA_VERSION:
+            return
+
+        # user_version was never set before the version gate existed, so
+        # a legacy database reports 0 just like a fresh file; what's on
+        # disk before CREATE_TABLES_SQL runs is what tells them apart
+        chat_history_columns = {
+            row[1] for row in conn.execute("PRAGMA table_info(chat_history)")
+        }
+
+        # Migrations for databases created before the version gate existed
+        if current_version < 2:
+            try:
+                conn.execute("ALTER TABLE chat_history ADD COLUMN thread_position INTEGER DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass  # fresh database or column already present
+        if current_version < 3:
+            # Superseded by the composite indexes below; the CSV
+            # repository_ids index never helped a LIKE filter anyway
+            conn.execute("DROP INDEX IF EXISTS idx_chat_history_user")
+            conn.execute("DROP INDEX IF EXISTS idx_chat_history_search_type")
+            conn.execute("DROP INDEX IF EXISTS idx_chat_history_repository_ids")
+        if current_version < 5:
+            conn.execute("DROP TRIGGER IF EXISTS repositories_updated_at")
+            conn.execute("DROP TRIGGER IF EXISTS chat_history_updated_at")
+            conn.execute("DROP TRIGGER IF EXISTS user_preferences_updated_at")
+        if current_version < 6:
+            try:
+                conn.execute("ALTER TABLE chat_history ADD COLUMN reply_count INTEGER DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass  # fresh database or column already present
+
+        # Incremental autovacuum lets the pool's periodic sweep reclaim
+        # free pages without a full VACUUM (only binds on a fresh database)
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+        # Enable foreign keys (executescript commits the implicit transaction,
+        # so set the pragma first)
         conn.execute("PRAGMA foreign_keys = ON")
-        
+
         # Create tables
         conn.executescript(CREATE_TABLES_SQL)
-        
-        # Verify foreign key support
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA foreign_keys")
-        if not cursor.fetchone()[0]:
-            raise Exception("Foreign key support could not be enabled")
-            
+
+        # Backfill link rows from the legacy CSV column; gate on the
+        # column itself so legacy v0 databases are included and fresh
+        # ones (which never had it) are skipped
+        if "repository_ids" in chat_history_columns and current_version < 4:
+            conn.execute("""
+                INSERT OR IGNORE INTO chat_history_repositories (chat_id, dataset_id)
+                SELECT ch.id, je.value
+                FROM chat_history ch, json_each('["' || REPLACE(ch.repository_ids, ',', '","') || '"]') je
+                WHERE ch.repository_ids IS NOT NULL AND ch.repository_ids != ''
+            """)
+
+        # Backfill reply counts once for databases that predate the
+        # column; any pre-existing chat_history table qualifies
+        if chat_history_columns and current_version < 6:
+            conn.execute("""
+                UPDATE chat_history SET reply_count = (
+                    SELECT COUNT(*) FROM chat_history c WHERE c.parent_id = chat_history.id
+                )
+            """)
+
+        # The CSV column is fully superseded by the link table; dropping it
+        # must come after the backfill above has read it
+        if current_version < 7:
+            try:
+                conn.execute("ALTER TABLE chat_history DROP COLUMN repository_ids")
+            except sqlite3.OperationalError:
+                pass  # fresh database or SQLite without DROP COLUMN
+
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        # Refresh planner statistics so the new indexes actually get picked
+        conn.execute("PRAGMA analysis_limit=1000")
+        conn.execute("ANALYZE")
+
         conn.commit()
-        logging.info("Database initialized successfully")
+        logger.info("Database initialized successfully")
     except Exception as e:
-        logging.error(f"Failed to initialize database: {str(e)}")
+        logger.error("Failed to initialize database: %s", e)
         raise
     finally:
         if conn:
@@ -1,44 +1,87 @@
-import gradio as gr
 import sqlite3
 import signal
 import sys
+import json
+import time
+import queue
 import argparse
 import asyncio
 import logging
+import logging.handlers
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, TYPE_CHECKING
 from contextlib import asynccontextmanager
-from config.settings import settings
+from config.settings import settings, LOG_FORMAT
 from database.schema import init_database
-from database.connection import DatabasePool
-from modules.repository import RepositoryManager
-from modules.chat import ChatManager
-from modules.search import SearchManager
-from ui.app import create_app
+from database.connection import DatabasePool, pool as db_pool
+
+# gradio (and the managers that pull in httpx) are imported lazily in
+# initialize(); importing them here adds seconds to --help and cold start
+if TYPE_CHECKING:
+    import gradio as gr
+
+PATH_CACHE_FILE = Path.home() / ".cache" / "codegraphx" / "paths.json"
+PATH_CACHE_VALIDITY = 300.0  # seconds a cached directory check stays trusted
+
+def _ensure_runtime_dirs(paths) -> None:
+    """Create runtime directories, consulting a JSON sidecar so repeat
+    startups skip the mkdir/stat when the entry is still fresh"""
+    now = time.time()
+    try:
+        cached = json.loads(PATH_CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        cached = {}
+
+    dirty = False
+    for path in paths:
+        key = str(path)
+        if now - cached.get(key, 0) < PATH_CACHE_VALIDITY:
+            continue
+        Path(path).mkdir(parents=True, exist_ok=True)
+        cached[key] = now
+        dirty = True
+
+    if dirty:
+        try:
+            PATH_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            PATH_CACHE_FILE.write_text(json.dumps(cached))
+        except OSError:
+            pass  # cache is best-effort; the directories themselves exist
 
 class Application:
     def __init__(self):
         self.db_pool: Optional[DatabasePool] = None
-        self.app: Optional[gr.Blocks] = None
+        self.app: Optional["gr.Blocks"] = None
         self.managers: Dict[str, Any] = {}
         self.shutdown_event = asyncio.Event()
+        self._log_listener: Optional[logging.handlers.QueueListener] = None
         self._setup_logging()
         
     def _setup_logging(self):
-        """Configure application logging"""
-        log_dir = Path(settings.LOG_FILE).parent
-        log_dir.mkdir(parents=True, exist_ok=True)
-        
-        logging.getLogger().handlers.clear()
-        
-        logging.basicConfig(
-            level=getattr(logging, settings.LOG_LEVEL),
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(str(settings.LOG_FILE)),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        """Configure application logging: async call sites enqueue records
+        and a background listener does the actual file/stream I/O"""
+        # Settings only creates the default log directory; LOG_FILE is
+        # env-overridable and we run before _ensure_runtime_dirs, so make
+        # sure the parent exists before the FileHandler opens the file
+        Path(settings.LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+        root = logging.getLogger()
+        root.handlers.clear()
+
+        log_queue = queue.Queue(-1)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(getattr(logging, settings.LOG_LEVEL))
+
+        formatter = logging.Formatter(LOG_FORMAT)
+        sink_handlers = [
+            logging.FileHandler(str(settings.LOG_FILE)),
+            logging.StreamHandler(sys.stdout)
+        ]
+        for handler in sink_handlers:
+            handler.setFormatter(formatter)
+
+        self._log_listener = logging.handlers.QueueListener(log_queue, *sink_handlers)
+        self._log_listener.start()
+
         self.logger = logging.getLogger(__name__)
         self.logger.info("Logging initialized")
 
@@ -55,21 +98,27 @@ class Application:
         """Initialize application components"""
         self.logger.info("Initializing application...")
         try:
+            import gradio as gr
+            from modules.repository import RepositoryManager
+            from modules.chat import ChatManager
+            from modules.search import SearchManager
+            from ui.app import create_app
+
             db_path = Path(settings.DATABASE_PATH)
             self.logger.info(f"Using database path: {db_path}")
-            
-            db_path.parent.mkdir(parents=True, exist_ok=True)
-            
+
+            _ensure_runtime_dirs([db_path.parent, Path(settings.LOG_FILE).parent])
+
             init_database(str(db_path))
             self.logger.info("Database initialized successfully")
             
-            self.db_pool = DatabasePool(
-                str(db_path),
-                max_connections=settings.MAX_DB_CONNECTIONS,
-                timeout=settings.DB_TIMEOUT
-            )
+            # The module-level pool is what get_db_connection hands to
+            # every manager; sweeping a private second pool left the one
+            # actually serving queries unvalidated
+            self.db_pool = db_pool
             self.logger.info("Attempting to validate database connections...")
             await self.db_pool.validate_connections()
+            self.db_pool.start_periodic_validation()
             self.logger.info("Database pool created and validated")
             
             self.logger.info("Initializing managers...")
@@ -144,6 +193,9 @@ class Application:
             for task in cleanup_tasks:
                 if not task.done():
                     task.cancel()
+            if self._log_listener:
+                self._log_listener.stop()
+                self._log_listener = None
 
     async def start(self, host: str, port: int):
         """Start the application"""
@@ -179,16 +231,13 @@ async def main():
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
     args = parser.parse_args()
 
-    log_level = logging.DEBUG if args.debug else logging.INFO
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
     logger = logging.getLogger(__name__)
-    
+
     try:
-        logger.info(f"Starting application on {args.host}:{args.port}")
         app = Application()
+        if args.debug:
+            logging.getLogger().setLevel(logging.DEBUG)
+        logger.info(f"Starting application on {args.host}:{args.port}")
 
         for sig in (signal.SIGTERM, signal.SIGINT):
             signal.signal(sig, lambda s, f: asyncio.create_task(app.shutdown()))
@@ -203,4 +252,11 @@ async def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    try:
+        # Drop-in libuv event loop: noticeably faster socket and timer
+        # handling for the many small HTTP/DB calls this app makes
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass  # stdlib loop works the same, just slower
     asyncio.run(main())
\ No newline at end of file
@@ -1,79 +1,166 @@
-import httpx
+import random
+import orjson
 from typing import AsyncContextManager, Type, Dict
 from pydantic import BaseModel
-from collections import defaultdict
+from collections import defaultdict, deque
 import asyncio
+from .exceptions import APIError
+
+# Methods safe to replay on failure regardless of response status
+IDEMPOTENT_METHODS = frozenset({"get", "head", "put", "delete", "options"})
+
+_JSON_HEADERS = {"content-type": "application/json"}
 
 class AsyncHTTPClient(AsyncContextManager):
     def __init__(self, base_url: str, timeout: float = 30.0, max_retries: int = 3):
+        import httpx  # deferred: keeps module import light for CLI paths
         self.max_retries = max_retries
+        self._enter_count = 0
         self.retry_delay = 1.0
+        self.max_retry_delay = 10.0
+        # Parse the timeout into an httpx.Timeout once; passing the raw
+        # float per request would rebuild the object on every call
+        self._default_timeout = httpx.Timeout(timeout)
         self.client = httpx.AsyncClient(
             base_url=str(base_url),
-            timeout=timeout,
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
+            timeout=self._default_timeout,
+            # HTTP/2 multiplexes the batched API calls over few sockets;
+            # transport-level retries stay at 0 so _request_with_retry is
+            # the only retry layer
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=100,
+                keepalive_expiry=60.0
+            )
         )
 
     async def _request_with_retry(self, method: str, url: str, **kwargs):
+        import httpx  # already in sys.modules after __init__; cheap lookup
+        json_body = kwargs.pop("json", None)
+        if json_body is not None:
+            # orjson serializes straight to bytes, skipping httpx's
+            # stdlib-json dump and the str->bytes encode
+            kwargs["content"] = orjson.dumps(json_body)
+            headers = kwargs.get("headers")
+            kwargs["headers"] = {**_JSON_HEADERS, **headers} if headers else _JSON_HEADERS
         for attempt in range(self.max_retries):
             try:
                 response = await getattr(self.client, method)(url, **kwargs)
                 response.raise_for_status()
                 return response
-            except httpx.HTTPError as e:
+            except httpx.HTTPStatusError as e:
+                # Only replay server errors, rate limits, or any failure
+                # on an idempotent method; other 4xx on POST won't get
+                # better on a replay
+                retryable = (e.response.status_code >= 500
+                             or e.response.status_code == 429
+                             or method.lower() in IDEMPOTENT_METHODS)
+                if not retryable or attempt == self.max_retries - 1:
+                    raise APIError(f"HTTP request failed after {attempt + 1} attempts: {str(e)}")
+                await asyncio.sleep(self._retry_delay(attempt, e.response))
+            except httpx.TransportError as e:
                 if attempt == self.max_retries - 1:
                     raise APIError(f"HTTP request failed after {self.max_retries} attempts: {str(e)}")
-                await asyncio.sleep(self.retry_delay * (2 ** attempt))
+                await asyncio.sleep(self._retry_delay(attempt))
+
+    async def request_json(self, method: str, url: str, **kwargs):
+        """Request and decode a JSON response with orjson, skipping
+        httpx's slower stdlib-json path and the bytes->str decode"""
+        response = await self._request_with_retry(method, url, **kwargs)
+        return orjson.loads(response.content)
+
+    def _retry_delay(self, attempt: int, response=None) -> float:
+        """Exponential backoff with jitter, honoring Retry-After if sent.
+
+        The exponential term is capped so late attempts don't sleep
+        unboundedly, then jittered across [cap/2, cap] so a herd of
+        clients retrying the same outage spreads out instead of
+        re-aligning on the upstream.
+        """
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.max_retry_delay)
+                except ValueError:
+                    pass
+        delay = min(self.max_retry_delay, self.retry_delay * (2 ** attempt))
+        return random.uniform(delay * 0.5, delay)
     
     async def __aenter__(self):
+        self._enter_count += 1
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        # The pooled client is shared across nested enters; only the
+        # outermost exit actually closes the sockets
+        self._enter_count -= 1
+        if self._enter_count <= 0:
+            await self.aclose()
+
+    async def aclose(self):
+        """Close the underlying client; for explicit shutdown paths"""
         await self.client.aclose()
 
 class RequestBatcher:
     def __init__(self, batch_size: int = 5, batch_window: float = 0.1):
         self.batch_size = batch_size
         self.batch_window = batch_window
-        self.pending_requests = []
-        self.lock = asyncio.Lock()
-        self._batch_task = None
+        # deque + single runner task: O(1) enqueue/dequeue, no list copies,
+        # no cancel/recreate churn when a batch fills mid-window
+        self.pending_requests = deque()
+        self._flush_event = asyncio.Event()
+        self._runner_task = None
 
     async def add_request(self, request: Dict) -> asyncio.Future:
-        future = asyncio.Future()
-        
-        async with self.lock:
-            self.pending_requests.append((request, future))
-            
-            if len(self.pending_requests) >= self.batch_size:
-                if self._batch_task:
-                    self._batch_task.cancel()
-                self._batch_task = asyncio.create_task(self._process_batch())
-            elif not self._batch_task:
-                self._batch_task = asyncio.create_task(self._process_batch())
-        
+        future = asyncio.get_running_loop().create_future()
+        self.pending_requests.append((request, future))
+
+        if len(self.pending_requests) >= self.batch_size:
+            self._flush_event.set()
+        if self._runner_task is None:
+            self._runner_task = asyncio.create_task(self._runner())
+
         return await future
 
-    async def _process_batch(self):
-        await asyncio.sleep(self.batch_window)
-        
-        async with self.lock:
+    async def _runner(self):
+        while True:
+            # Flush either when a batch fills or when the window elapses
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.batch_window)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+
+            while self.pending_requests:
+                batch = []
+                while self.pending_requests and len(batch) < self.batch_size:
+                    batch.append(self.pending_requests.popleft())
+                await self._process_batch(batch)
+
             if not self.pending_requests:
+                self._runner_task = None
                 return
-                
-            batch = self.pending_requests[:self.batch_size]
-            self.pending_requests = self.pending_requests[self.batch_size:]
-            self._batch_task = None
 
+    async def _process_batch(self, batch):
         try:
             # Process the batch
             results = await self._execute_batch([req for req, _ in batch])
-            
+
             # Set results for futures
             for (_, future), result in zip(batch, results):
                 if not future.done():
                     future.set_result(result)
-                    
+
+            # A short results list would leave the zipped-off tail pending
+            # forever; fail those futures so their callers return
+            for _, future in batch[len(results):]:
+                if not future.done():
+                    future.set_exception(
+                        APIError("Batch response returned fewer results than requests")
+                    )
+
         except Exception as e:
             # Handle errors
             for _, future in batch:
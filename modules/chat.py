@@ -1,47 +1,335 @@
+import re
+import time
 import httpx
+import orjson
 import logging
 import sqlite3
+import asyncio
+from collections import Counter, OrderedDict, deque
 from uuid import UUID, uuid4
 from typing import Dict, List, Optional, TypedDict, Literal
 from datetime import datetime
 from config.settings import settings
 from database.connection import get_db_connection
-from .base import AsyncHTTPClient
+from .base import AsyncHTTPClient, RequestBatcher
 from .types import SearchType, SearchHistoryItem, APIResponse
 from .exceptions import APIError, DatabaseError, ValidationError
-from .metrics import Metrics
+from .metrics import Metrics, instrumented
 from .validation import validate_input
-from .logging_utils import log_request_response
+from .logging_utils import enqueue_request_response
+
+logger = logging.getLogger(__name__)
+
+# Compiled once at import so validation is a single C-level scan
+_DANGEROUS_RE = re.compile(r"[<>{}();]")
+
+# Burst edits of the same message coalesce for this long before one
+# combined transaction hits disk
+EDIT_FLUSH_INTERVAL = 0.25
+
+# How long a cached chat_history COUNT(*) stays fresh
+HISTORY_COUNT_TTL = 5.0
+
+# Recently served history pages kept for re-renders between writes
+HISTORY_CACHE_SIZE = 64
+
+# TTL backstop on cached history pages: version bumps invalidate on
+# every tracked write, but entries also age out so nothing stale can
+# outlive this window
+HISTORY_CACHE_TTL = 5.0
+
+# Validation type schemas, built once at import; each call supplies only
+# the value dict
+_SEND_SCHEMA = {"query": str, "search_type": SearchType, "parent_id": Optional[UUID]}
+_EDIT_SCHEMA = {"message_id": UUID, "new_text": str}
+_EXCLUDE_SCHEMA = {"message_id": UUID}
+_SAVE_SCHEMA = {
+    "text": str,
+    "user": str,
+    "search_type": str,
+    "repository_ids": List[str],
+    "parent_id": Optional[UUID]
+}
+_HISTORY_SCHEMA = {"page": int, "page_size": Optional[int]}
+_UPDATE_REPOS_SCHEMA = {"message_id": UUID, "repository_ids": List[str]}
+
+# Static error responses built once; the dynamic 4xx branches share a
+# status -> (message, default detail) table instead of an if/elif chain.
+# Responses assembled here are from values this module just produced, so
+# model_construct skips the validator chain user input has to pass.
+_ENDPOINT_NOT_FOUND = APIResponse.model_construct(
+    status="error",
+    message="Search endpoint not found",
+    errors=["Endpoint not found"]
+)
+_CLIENT_ERROR_MESSAGES = {
+    422: ("Invalid search parameters", "Validation error"),
+    400: ("Bad request", "Bad request"),
+}
+
+# Success payloads for the fixed-shape write acks; shared read-only dicts,
+# built once instead of per call
+_EDIT_OK = {"status": "success", "message": "Message updated"}
+_EXCLUDE_OK = {"status": "success", "message": "Message excluded"}
+_REPOS_OK = {"status": "success", "message": "Repository context updated"}
+
+class ChatInsertBatcher:
+    """Coalesces chat_history inserts into one BEGIN IMMEDIATE transaction
+    so a burst of messages pays a single fsync instead of one per row"""
+
+    def __init__(self, batch_size: int = settings.MAX_BATCH_SIZE, batch_window: float = 0.05):
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.pending_rows = deque()
+        self._flush_event = asyncio.Event()
+        self._runner_task = None
+
+    async def add_row(self, message_id: str, text: str, user: str, search_type: str,
+                      repository_ids: List[str], parent_id: Optional[str]) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self.pending_rows.append(((message_id, text, user, search_type, repository_ids, parent_id), future))
+
+        if len(self.pending_rows) >= self.batch_size:
+            self._flush_event.set()
+        if self._runner_task is None:
+            self._runner_task = asyncio.create_task(self._runner())
+
+        await future
+
+    async def _runner(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.batch_window)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+
+            while self.pending_rows:
+                batch = []
+                while self.pending_rows and len(batch) < self.batch_size:
+                    batch.append(self.pending_rows.popleft())
+                await self._flush(batch)
+
+            if not self.pending_rows:
+                self._runner_task = None
+                return
+
+    async def _flush(self, batch):
+        rows = [row for row, _ in batch]
+        try:
+            async with get_db_connection(readonly=False) as conn:
+                await asyncio.to_thread(self._write_batch, conn, rows)
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    @staticmethod
+    def _write_batch(conn: sqlite3.Connection, rows) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            prepared = []
+            # Each anchor's stored max is read once, then counted up in
+            # Python: the SELECT can't see this batch's uninserted rows,
+            # so re-querying per row would hand two replies to the same
+            # parent the same position
+            next_position = {}
+            for message_id, text, user, search_type, repository_ids, parent_id in rows:
+                anchor = parent_id if parent_id else message_id
+                position = next_position.get(anchor)
+                if position is None:
+                    position = conn.execute("""
+                        SELECT COALESCE(MAX(thread_position), 0) + 1
+                        FROM chat_history
+                        WHERE COALESCE(parent_id, id) = ?
+                    """, (anchor,)).fetchone()[0]
+                next_position[anchor] = position + 1
+                prepared.append((message_id, text, user, search_type,
+                                parent_id, position))
+            conn.executemany("""
+                INSERT INTO chat_history (
+                    id, text, user, created_at, search_type,
+                    parent_id, thread_position
+                )
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?, ?, ?)
+            """, prepared)
+            link_rows = [
+                (message_id, dataset_id)
+                for message_id, _, _, _, repository_ids, _ in rows
+                for dataset_id in repository_ids if dataset_id
+            ]
+            if link_rows:
+                conn.executemany("""
+                    INSERT OR IGNORE INTO chat_history_repositories (chat_id, dataset_id)
+                    VALUES (?, ?)
+                """, link_rows)
+            # Maintain the denormalized reply counter so reads never run a
+            # correlated COUNT(*) per row
+            reply_counts = Counter(
+                parent_id for _, _, _, _, _, parent_id in rows if parent_id
+            )
+            if reply_counts:
+                conn.executemany("""
+                    UPDATE chat_history SET reply_count = reply_count + ?
+                    WHERE id = ?
+                """, [(count, parent_id) for parent_id, count in reply_counts.items()])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+class SearchBatcher(RequestBatcher):
+    """Coalesces concurrent /search POSTs into one /search/batch call"""
+
+    def __init__(self, client, batch_size: int = 16, batch_window: float = 0.005):
+        super().__init__(batch_size, batch_window)
+        self.client = client
+
+    async def _execute_batch(self, requests):
+        if len(requests) == 1:
+            # No round-trip to save for a lone query; keep the single
+            # endpoint so its per-status error details stay intact
+            response = await self.client.post(
+                "/search", content=orjson.dumps(requests[0]),
+                headers={"content-type": "application/json"})
+            return [(response.status_code, orjson.loads(response.content))]
+        response = await self.client.post(
+            "/search/batch", content=orjson.dumps({"queries": requests}),
+            headers={"content-type": "application/json"})
+        response.raise_for_status()
+        results = orjson.loads(response.content).get("results", [])
+        return [(response.status_code, result) for result in results]
 
 class ChatManager(AsyncHTTPClient):
     def __init__(self, base_url: str = settings.API_BASE_URL, timeout: float = settings.timeout.connect_timeout):
         super().__init__(base_url, timeout)
         self.metrics = Metrics()
+        self._insert_batcher = ChatInsertBatcher()
+        self._search_batcher = SearchBatcher(self.client)
+        # Latest-value-wins buffers: repeated edits of one message collapse
+        # to a single UPDATE when the flusher wakes
+        self._pending_edits: Dict[str, str] = {}
+        self._pending_repos: Dict[str, List[str]] = {}
+        self._pending_deletes: set = set()
+        self._edit_flusher_task = None
+        self._history_count_cache = (0.0, 0)  # (monotonic timestamp, count)
+        # Page cache: entries carry the version they were built at and are
+        # ignored once any write bumps _hist_version
+        self._hist_cache: OrderedDict = OrderedDict()
+        self._hist_version = 0
+
+    def _wake_edit_flusher(self) -> None:
+        if self._edit_flusher_task is None:
+            self._edit_flusher_task = asyncio.create_task(self._edit_flusher())
 
-    async def __aenter__(self):
-        return self
+    async def _edit_flusher(self) -> None:
+        # Debounce: sleep the window first so a typing burst lands as one
+        # transaction, then keep draining until the buffers stay empty
+        while self._pending_edits or self._pending_repos or self._pending_deletes:
+            await asyncio.sleep(EDIT_FLUSH_INTERVAL)
+            try:
+                await self._flush_pending_edits()
+            except Exception as e:
+                logger.error("Error flushing pending edits: %s", e)
+        self._edit_flusher_task = None
+
+    async def _flush_pending_edits(self) -> None:
+        if not (self._pending_edits or self._pending_repos or self._pending_deletes):
+            return
+        edits, self._pending_edits = self._pending_edits, {}
+        repos, self._pending_repos = self._pending_repos, {}
+        deletes, self._pending_deletes = self._pending_deletes, set()
+        try:
+            async with get_db_connection(readonly=False) as conn:
+                await asyncio.to_thread(self._write_pending_edits, conn, edits, repos, deletes)
+        except sqlite3.Error as e:
+            # The handlers already acknowledged these writes, so a failed
+            # flush must not drop them: merge the popped buffers back for
+            # the flusher loop to retry. Entries buffered while the write
+            # was in flight are newer and win; a newer delete supersedes
+            # a requeued edit the same way exclude_message drops one.
+            for mid, text in edits.items():
+                if mid not in self._pending_edits and mid not in self._pending_deletes:
+                    self._pending_edits[mid] = text
+            for mid, ids in repos.items():
+                if mid not in self._pending_repos and mid not in self._pending_deletes:
+                    self._pending_repos[mid] = ids
+            self._pending_deletes |= deletes
+            # The handlers only buffer in memory; the debounced write
+            # here is where their database failures actually surface
+            self.metrics.increment("chat_edit_flush_db_errors")
+            logger.error("Database error flushing pending edits: %s", e)
+            raise DatabaseError(f"Database error: {str(e)}")
+
+    @staticmethod
+    def _write_pending_edits(conn: sqlite3.Connection,
+                             edits: Dict[str, str],
+                             repos: Dict[str, List[str]],
+                             deletes: set = frozenset()) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if edits:
+                conn.executemany("""
+                    UPDATE chat_history
+                    SET text = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, [(text, mid) for mid, text in edits.items()])
+            if repos:
+                conn.executemany("""
+                    UPDATE chat_history
+                    SET updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, [(mid,) for mid in repos])
+                conn.executemany("""
+                    DELETE FROM chat_history_repositories WHERE chat_id = ?
+                """, [(mid,) for mid in repos])
+                conn.executemany("""
+                    INSERT OR IGNORE INTO chat_history_repositories (chat_id, dataset_id)
+                    VALUES (?, ?)
+                """, [(mid, dataset_id) for mid, ids in repos.items() for dataset_id in ids])
+            if deletes:
+                # Link rows go with the message via ON DELETE CASCADE
+                conn.executemany("""
+                    DELETE FROM chat_history WHERE id = ?
+                """, [(mid,) for mid in deletes])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        # Flush anything still debouncing so shutdown doesn't drop edits
+        if self._edit_flusher_task is not None:
+            self._edit_flusher_task.cancel()
+            self._edit_flusher_task = None
+        try:
+            await self._flush_pending_edits()
+        except Exception as e:
+            logger.error("Error flushing edits on shutdown: %s", e)
+        await super().__aexit__(exc_type, exc_val, exc_tb)
 
+    @staticmethod
     def validate_message(text: str, max_length: int = 1000) -> bool:
         try:
             if not text or not text.strip():
                 raise ValidationError("Message cannot be empty")
-                
+
             if len(text) > max_length:
                 raise ValidationError(f"Message exceeds maximum length of {max_length} characters")
-                
-            dangerous_chars = ['<', '>', '{', '}', '(', ')', ';']
-            if any(char in text for char in dangerous_chars):
+
+            if _DANGEROUS_RE.search(text):
                 raise ValidationError("Message contains invalid characters")
             
             return True
         
         except Exception as e:
-            logging.error(f"Message validation error: {str(e)}")
+            logger.error("Message validation error: %s", e)
             raise ValidationError(f"Message validation failed: {str(e)}")
 
+    @instrumented("chat_message_send")
     async def send_message(self, query: str, search_type: SearchType, 
                         parent_id: Optional[UUID] = None) -> APIResponse:
         """Send message with threading support"""
@@ -51,286 +339,276 @@ class ChatManager(AsyncHTTPClient):
                 "query": query,
                 "search_type": search_type,
                 "parent_id": parent_id
-            }, {
-                "query": str,
-                "search_type": SearchType,
-                "parent_id": Optional[UUID]
-            })
+            }, _SEND_SCHEMA)
             
             self.validate_message(query)
             
-            # Track metrics
-            await self.metrics.increment("chat_message_send_attempts")
-            start_time = time.time()
-            
+            pid_str = str(parent_id) if parent_id else None
+
             request_data = {
                 "search_type": search_type.value,
                 "query": query,
-                "parent_id": str(parent_id) if parent_id else None
+                "parent_id": pid_str
             }
             
             # Log request
-            await log_request_response(request_data, None)
+            enqueue_request_response(request_data, None)
             
             try:
-                response = await self.client.post("/search", json=request_data)
-                response_data = response.json()
-                
-                if response.status_code == 404:
-                    return APIResponse(
-                        status="error",
-                        message="Search endpoint not found",
-                        errors=["Endpoint not found"]
-                    )
-                elif response.status_code == 422:
-                    return APIResponse(
-                        status="error",
-                        message="Invalid search parameters",
-                        errors=[response_data.get('detail', 'Validation error')]
-                    )
-                elif response.status_code == 400:
-                    return APIResponse(
+                status_code, response_data = await self._search_batcher.add_request(request_data)
+
+                if status_code == 404:
+                    return _ENDPOINT_NOT_FOUND
+                client_error = _CLIENT_ERROR_MESSAGES.get(status_code)
+                if client_error is not None:
+                    message, default_detail = client_error
+                    return APIResponse.model_construct(
                         status="error",
-                        message="Bad request",
-                        errors=[response_data.get('detail', 'Bad request')]
+                        message=message,
+                        errors=[response_data.get('detail', default_detail)]
                     )
-                    
-                response.raise_for_status()
+                if status_code >= 400:
+                    raise APIError(f"Search request failed with status {status_code}")
                 
                 # Log response
-                await log_request_response(request_data, response_data)
-                
-                # Record success and timing
-                await self.metrics.increment("chat_message_send_success")
-                await self.metrics.record_time("chat_message_send_duration", time.time() - start_time)
+                enqueue_request_response(request_data, response_data)
                 
-                return APIResponse(
+                return APIResponse.model_construct(
                     status="success",
                     message="Message sent successfully",
                     data=response_data
                 )
                 
             except httpx.HTTPError as e:
-                await self.metrics.increment("chat_message_send_api_errors")
-                logging.error(f"HTTP error sending message: {str(e)}")
-                return APIResponse(
+                self.metrics.increment("chat_message_send_api_errors")
+                logger.error("HTTP error sending message: %s", e)
+                return APIResponse.model_construct(
                     status="error",
                     message="Failed to send message",
                     errors=[str(e)]
                 )
                 
         except ValidationError as e:
-            await self.metrics.increment("chat_message_validation_errors")
-            logging.error(f"Validation error: {str(e)}")
-            return APIResponse(
+            self.metrics.increment("chat_message_validation_errors")
+            logger.error("Validation error: %s", e)
+            return APIResponse.model_construct(
                 status="error",
                 message="Validation error",
                 errors=[str(e)]
             )
         except Exception as e:
-            await self.metrics.increment("chat_message_send_errors")
-            logging.error(f"Unexpected error: {str(e)}")
-            return APIResponse(
+            self.metrics.increment("chat_message_send_errors")
+            logger.error("Unexpected error: %s", e)
+            return APIResponse.model_construct(
                 status="error",
                 message="An unexpected error occurred",
                 errors=[str(e)]
             )
 
+    @instrumented("chat_message_edit")
     async def edit_message(self, message_id: UUID, new_text: str) -> Dict:
         try:
             # Input validation
             validate_input({
                 "message_id": message_id,
                 "new_text": new_text
-            }, {
-                "message_id": UUID,
-                "new_text": str
-            })
+            }, _EDIT_SCHEMA)
             
-            # Track metrics
-            await self.metrics.increment("chat_message_edit_attempts")
-            start_time = time.time()
-            
-            request_data = {
-                "message_id": str(message_id),
-                "new_text": new_text
-            }
-            
-            # Log request
-            await log_request_response(request_data, None)
-            
-            try:
-                with get_db_connection() as conn:
-                    conn.execute("""
-                        UPDATE chat_history 
-                        SET text = ? 
-                        WHERE id = ?
-                    """, (new_text, str(message_id)))
-                    conn.commit()
-                    
-                response_data = {"status": "success", "message": "Message updated"}
-                
-                # Log response
-                await log_request_response(request_data, response_data)
-                
-                # Record success and timing
-                await self.metrics.increment("chat_message_edit_success")
-                await self.metrics.record_time("chat_message_edit_duration", time.time() - start_time)
-                
-                return response_data
-                
-            except sqlite3.Error as e:
-                await self.metrics.increment("chat_message_edit_db_errors")
-                logging.error(f"Database error editing message: {str(e)}")
-                raise DatabaseError(f"Database error: {str(e)}")
-                
+            mid = str(message_id)
+            enqueue_request_response({"message_id": mid, "new_text": new_text}, None)
+
+            # Latest value wins: burst edits of the same message
+            # coalesce into one UPDATE when the flusher wakes. Database
+            # failures surface from the flusher, not here.
+            self._pending_edits[mid] = new_text
+            self._wake_edit_flusher()
+            self._hist_version += 1
+
+            enqueue_request_response({"message_id": mid}, _EDIT_OK)
+
+            return _EDIT_OK
+
         except Exception as e:
-            await self.metrics.increment("chat_message_edit_errors")
-            logging.error(f"Error in edit_message: {str(e)}")
+            self.metrics.increment("chat_message_edit_errors")
+            logger.error("Error in edit_message: %s", e)
             raise
 
+    @instrumented("chat_message_exclude")
     async def exclude_message(self, message_id: UUID) -> Dict:
         try:
             # Input validation
             validate_input({
                 "message_id": message_id
-            }, {
-                "message_id": UUID
-            })
+            }, _EXCLUDE_SCHEMA)
             
-            # Track metrics
-            await self.metrics.increment("chat_message_exclude_attempts")
-            start_time = time.time()
+            mid = str(message_id)
+            enqueue_request_response({"message_id": mid}, None)
+
+            # Delete rides the same flush transaction as buffered
+            # edits; any pending edit of this message is dropped
+            self._pending_edits.pop(mid, None)
+            self._pending_repos.pop(mid, None)
+            self._pending_deletes.add(mid)
+            self._wake_edit_flusher()
+            self._hist_version += 1
+
+            enqueue_request_response({"message_id": mid}, _EXCLUDE_OK)
+
+            return _EXCLUDE_OK
+
+        except Exception as e:
+            self.metrics.increment("chat_message_exclude_errors")
+            logger.error("Error in exclude_message: %s", e)
+            raise
+
+    @instrumented("chat_message_save")
+    async def save_message(self, text: str, user: str, search_type: str, 
+                        repository_ids: List[str], parent_id: Optional[UUID] = None) -> Dict[str, str]:
+        """Save message with threading support"""
+        try:
+            # Input validation
+            validate_input({
+                "text": text,
+                "user": user,
+                "search_type": search_type,
+                "repository_ids": repository_ids,
+                "parent_id": parent_id
+            }, _SAVE_SCHEMA)
             
+            self.validate_message(text)
+
+            # Format the UUID once; ids are stored in canonical
+            # hyphenated form so parent_id must match the parent row
+            pid_str = str(parent_id) if parent_id else None
+
             request_data = {
-                "message_id": str(message_id)
+                "text": text,
+                "user": user,
+                "search_type": search_type,
+                "repository_ids": repository_ids,
+                "parent_id": pid_str
             }
-            
-            # Log request
-            await log_request_response(request_data, None)
-            
-            try:
-                with get_db_connection() as conn:
-                    conn.execute("""
-                        DELETE FROM chat_history 
-                        WHERE id = ?
-                    """, (str(message_id),))
-                    conn.commit()
+
+            enqueue_request_response(request_data, None)
+
+            message_id = str(uuid4())
+            await self._insert_batcher.add_row(
+                message_id, text, user, search_type,
+                repository_ids, pid_str
+            )
+
+            self._hist_version += 1
+
+            response_data = {"status": "success", "message_id": message_id}
+            enqueue_request_response(request_data, response_data)
+
+            return response_data
                     
-                response_data = {"status": "success", "message": "Message excluded"}
-                
-                # Log response
-                await log_request_response(request_data, response_data)
-                
-                # Record success and timing
-                await self.metrics.increment("chat_message_exclude_success")
-                await self.metrics.record_time("chat_message_exclude_duration", time.time() - start_time)
-                
-                return response_data
-                
-            except sqlite3.Error as e:
-                await self.metrics.increment("chat_message_exclude_db_errors")
-                logging.error(f"Database error excluding message: {str(e)}")
-                raise DatabaseError(f"Database error: {str(e)}")
-                
+        except ValidationError as e:
+            self.metrics.increment("chat_message_validation_errors")
+            logger.error("Validation error in save_message: %s", e)
+            raise
+        except DatabaseError as e:
+            self.metrics.increment("chat_message_save_db_errors")
+            logger.error("Database error in save_message: %s", e)
+            raise
         except Exception as e:
-            await self.metrics.increment("chat_message_exclude_errors")
-            logging.error(f"Error in exclude_message: {str(e)}")
+            self.metrics.increment("chat_message_save_errors")
+            logger.error("Unexpected error in save_message: %s", e)
             raise
 
-    async def save_message(self, text: str, user: str, search_type: str, 
-                        repository_ids: List[str], parent_id: Optional[UUID] = None) -> Dict[str, str]:
-        """Save message with threading support"""
-        async with self.metrics.timer("chat_message_save_duration"):
-            try:
-                # Input validation
-                validate_input({
-                    "text": text,
-                    "user": user,
-                    "search_type": search_type,
-                    "repository_ids": repository_ids,
-                    "parent_id": parent_id
-                }, {
-                    "text": str,
-                    "user": str,
-                    "search_type": str,
-                    "repository_ids": List[str],
-                    "parent_id": Optional[UUID]
-                })
-                
-                self.validate_message(text)
-                await self.metrics.increment("chat_message_save_attempts")
-                
-                request_data = {
-                    "text": text,
-                    "user": user,
-                    "search_type": search_type,
-                    "repository_ids": repository_ids,
-                    "parent_id": str(parent_id) if parent_id else None
-                }
-                
-                await log_request_response(request_data, None)
-                
-                async with get_db_connection() as conn:
-                    async with conn.transaction():
-                        message_id = str(uuid4())
-                        
-                        # Get thread position atomically
-                        thread_position = await conn.fetchval("""
-                            SELECT COALESCE(MAX(thread_position), 0) + 1
-                            FROM chat_history 
-                            WHERE COALESCE(parent_id, id) = COALESCE($1, $2)
-                        """, str(parent_id) if parent_id else message_id,
-                            str(parent_id) if parent_id else message_id)
-                        
-                        await conn.execute("""
-                            INSERT INTO chat_history (
-                                id, text, user, created_at, search_type, 
-                                repository_ids, parent_id, thread_position
-                            )
-                            VALUES ($1, $2, $3, CURRENT_TIMESTAMP, $4, $5, $6, $7)
-                        """, message_id, text, user, search_type, 
-                            ','.join(repository_ids), parent_id, thread_position)
-                        
-                        response_data = {"status": "success", "message_id": message_id}
-                        await log_request_response(request_data, response_data)
-                        await self.metrics.increment("chat_message_save_success")
-                        
-                        return response_data
-                        
-            except ValidationError as e:
-                await self.metrics.increment("chat_message_validation_errors")
-                logging.error(f"Validation error in save_message: {str(e)}")
-                raise
-            except DatabaseError as e:
-                await self.metrics.increment("chat_message_save_db_errors")
-                logging.error(f"Database error in save_message: {str(e)}")
-                raise
-            except Exception as e:
-                await self.metrics.increment("chat_message_save_errors")
-                logging.error(f"Unexpected error in save_message: {str(e)}")
-                raise
+    @staticmethod
+    def _read_history_page(conn: sqlite3.Connection, page_size: int, offset: int,
+                           after: Optional[tuple] = None,
+                           need_count: bool = True):
+        """Blocking history read, run via asyncio.to_thread.
+
+        Repository URLs come from the normalized link table and reply_count
+        is a stored column, so each page is one indexed range scan instead
+        of a correlated COUNT(*) plus a json_each string split per row.
+        """
+        total_count = None
+        if need_count:
+            total_count = conn.execute(
+                "SELECT COUNT(*) FROM chat_history"
+            ).fetchone()[0]
+
+        if after is not None:
+            # Keyset continuation: seek idx_chat_history_thread directly
+            # past the last row of the previous page
+            anchor, position = after
+            where = "WHERE (COALESCE(ch.parent_id, ch.id), ch.thread_position) > (?, ?)"
+            params = (anchor, position, page_size)
+        else:
+            where = ""
+            params = (page_size, offset)
 
-    async def get_chat_history_with_context(self, page: int = 1, page_size: Optional[int] = None) -> Dict[str, any]:
+        # json_group_array builds the URL list natively (no GROUP_CONCAT
+        # truncation, no per-row string splicing); one orjson parse per row
+        # turns it into a real list
+        cursor = conn.execute(f"""
+            SELECT
+                ch.*,
+                json_group_array(r.url) as repo_urls_json
+            FROM chat_history ch
+            LEFT JOIN chat_history_repositories m ON m.chat_id = ch.id
+            LEFT JOIN repositories r ON r.dataset_id = m.dataset_id
+            {where}
+            GROUP BY ch.id
+            ORDER BY
+                COALESCE(ch.parent_id, ch.id),
+                ch.thread_position
+            LIMIT ?{'' if after is not None else ' OFFSET ?'}
+        """, params)
+
+        # Iterate the cursor directly: rows arrive as sqlite3.Row (set
+        # C-side by the pool) and never pass through an intermediate
+        # fetchall list
+        messages = []
+        for row in cursor:
+            message = dict(row)
+            urls_json = message.pop("repo_urls_json", None)
+            message["repository_urls"] = [
+                url for url in (orjson.loads(urls_json) if urls_json else [])
+                if url is not None
+            ]
+            messages.append(message)
+
+        return total_count, messages
+
+    @instrumented("chat_history_get")
+    async def get_chat_history_with_context(self, page: int = 1, page_size: Optional[int] = None,
+                                            after: Optional[tuple] = None) -> Dict[str, any]:
+        """Fetch one page of threaded history.
+
+        Pass the previous response's next_cursor as `after` to continue
+        with an index seek; page/offset remains for direct page jumps.
+        """
         try:
             # Input validation
             validate_input({
                 "page": page,
                 "page_size": page_size
-            }, {
-                "page": int,
-                "page_size": Optional[int]
-            })
-            
-            # Track metrics
-            await self.metrics.increment("chat_history_get_attempts")
-            start_time = time.time()
+            }, _HISTORY_SCHEMA)
             
             if page_size is None:
                 page_size = settings.pagination.chat_history_page_size
                 
             offset = (page - 1) * page_size
-            
+
+            # Serve unchanged pages straight from memory; any write bumps
+            # _hist_version and quietly expires every cached page
+            cache_key = (page, page_size, after)
+            cached = self._hist_cache.get(cache_key)
+            if cached is not None:
+                version, cached_at, cached_response = cached
+                if (version == self._hist_version
+                        and time.monotonic() - cached_at < HISTORY_CACHE_TTL):
+                    self._hist_cache.move_to_end(cache_key)
+                    self.metrics.increment("chat_history_cache_hits")
+                    return cached_response
+                del self._hist_cache[cache_key]
+
             request_data = {
                 "page": page,
                 "page_size": page_size,
@@ -338,110 +616,84 @@ class ChatManager(AsyncHTTPClient):
             }
             
             # Log request
-            await log_request_response(request_data, None)
+            enqueue_request_response(request_data, None)
             
             try:
-                with get_db_connection() as conn:
-                    total_count = conn.execute(
-                        "SELECT COUNT(*) FROM chat_history"
-                    ).fetchone()[0]
-                    
-                    cursor = conn.execute("""
-                        SELECT 
-                            ch.*, 
-                            GROUP_CONCAT(r.url) as repository_urls,
-                            (SELECT COUNT(*) FROM chat_history WHERE parent_id = ch.id) as reply_count
-                        FROM chat_history ch
-                        LEFT JOIN repositories r ON r.dataset_id IN (
-                            SELECT value 
-                            FROM json_each('["' || REPLACE(ch.repository_ids, ',', '","') || '"]')
-                        )
-                        GROUP BY ch.id
-                        ORDER BY 
-                            COALESCE(ch.parent_id, ch.id),
-                            ch.thread_position,
-                            ch.created_at DESC
-                        LIMIT ? OFFSET ?
-                    """, (page_size, offset))
-                    
-                    messages = [dict(row) for row in cursor.fetchall()]
-                    
+                # A short-lived cached total keeps COUNT(*) off every page
+                now = time.monotonic()
+                cached_at, cached_total = self._history_count_cache
+                need_count = now - cached_at > HISTORY_COUNT_TTL
+
+                async with get_db_connection() as conn:
+                    # Rows are materialized to dicts inside the worker
+                    # thread; the cursor never crosses back to the loop
+                    total_count, messages = await asyncio.to_thread(
+                        self._read_history_page, conn, page_size, offset,
+                        after, need_count
+                    )
+
+                    if need_count:
+                        self._history_count_cache = (now, total_count)
+                    else:
+                        total_count = cached_total
+
+                    next_cursor = None
+                    if messages:
+                        last = messages[-1]
+                        next_cursor = (last["parent_id"] or last["id"],
+                                       last["thread_position"])
+
                     response_data = {
                         "messages": messages,
                         "total": total_count,
                         "page": page,
                         "page_size": page_size,
-                        "total_pages": (total_count + page_size - 1) // page_size
+                        "total_pages": (total_count + page_size - 1) // page_size,
+                        "next_cursor": next_cursor
                     }
+
+                    self._hist_cache[cache_key] = (
+                        self._hist_version, time.monotonic(), response_data
+                    )
+                    while len(self._hist_cache) > HISTORY_CACHE_SIZE:
+                        self._hist_cache.popitem(last=False)
                     
                     # Log response
-                    await log_request_response(request_data, response_data)
-                    
-                    # Record success and timing
-                    await self.metrics.increment("chat_history_get_success")
-                    await self.metrics.record_time("chat_history_get_duration", time.time() - start_time)
+                    enqueue_request_response(request_data, response_data)
                     
                     return response_data
                     
             except sqlite3.Error as e:
-                await self.metrics.increment("chat_history_get_db_errors")
-                logging.error(f"Database error getting chat history: {str(e)}")
+                self.metrics.increment("chat_history_get_db_errors")
+                logger.error("Database error getting chat history: %s", e)
                 raise DatabaseError(f"Database error: {str(e)}")
                 
         except Exception as e:
-            await self.metrics.increment("chat_history_get_errors")
-            logging.error(f"Error in get_chat_history: {str(e)}")
+            self.metrics.increment("chat_history_get_errors")
+            logger.error("Error in get_chat_history: %s", e)
             raise
 
+    @instrumented("message_repositories_update")
     async def update_message_repositories(self, message_id: UUID, repository_ids: List[str]) -> Dict:
         try:
             # Input validation
             validate_input({
                 "message_id": message_id,
                 "repository_ids": repository_ids
-            }, {
-                "message_id": UUID,
-                "repository_ids": List[str]
-            })
-            
-            # Track metrics
-            await self.metrics.increment("message_repositories_update_attempts")
-            start_time = time.time()
+            }, _UPDATE_REPOS_SCHEMA)
             
-            request_data = {
-                "message_id": str(message_id),
-                "repository_ids": repository_ids
-            }
-            
-            # Log request
-            await log_request_response(request_data, None)
-            
-            try:
-                with get_db_connection() as conn:
-                    conn.execute("""
-                        UPDATE chat_history 
-                        SET repository_ids = ?
-                        WHERE id = ?
-                    """, (','.join(repository_ids), str(message_id)))
-                    conn.commit()
-                    
-                response_data = {"status": "success", "message": "Repository context updated"}
-                
-                # Log response
-                await log_request_response(request_data, response_data)
-                
-                # Record success and timing
-                await self.metrics.increment("message_repositories_update_success")
-                await self.metrics.record_time("message_repositories_update_duration", time.time() - start_time)
-                
-                return response_data
-                
-            except sqlite3.Error as e:
-                await self.metrics.increment("message_repositories_update_db_errors")
-                logging.error(f"Database error updating repositories: {str(e)}")
-                raise DatabaseError(f"Database error: {str(e)}")
-                
+            mid = str(message_id)
+            enqueue_request_response({"message_id": mid, "repository_ids": repository_ids}, None)
+
+            self._pending_repos[mid] = list(repository_ids)
+            self._wake_edit_flusher()
+            self._hist_version += 1
+
+            enqueue_request_response({"message_id": mid}, _REPOS_OK)
+
+            return _REPOS_OK
+
         except Exception as e:
-            await self.metrics.increment("message_repositories_update_errors")
-            logging.error(f"Error in update_message_repositories: {str(e)}")
+            self.metrics.increment("message_repositories_update_errors")
+            logger.error("Error in update_message_repositories: %s", e)
             raise
\ No newline at end of file
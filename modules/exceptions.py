@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import cached_property
 from uuid import uuid4
 from typing import Optional, List, Dict, Any
 from http import HTTPStatus
@@ -6,7 +7,7 @@ from http import HTTPStatus
 class BaseError(Exception):
     """Base exception class for the application"""
     def __init__(
-        self, 
+        self,
         message: str,
         code: Optional[str] = None,
         status_code: int = HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -15,11 +16,19 @@ class BaseError(Exception):
         self.message = message
         self.code = code
         self.status_code = status_code
-        self.timestamp = datetime.now()
-        self.trace_id = str(uuid4())
         self.details = details or []
         super().__init__(self.message)
 
+    # Most raises are caught and logged via str(e); the clock read and
+    # CSPRNG draw only happen if a response actually renders them
+    @cached_property
+    def timestamp(self) -> datetime:
+        return datetime.now()
+
+    @cached_property
+    def trace_id(self) -> str:
+        return str(uuid4())
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "error": self.__class__.__name__,
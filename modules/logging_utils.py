@@ -1,12 +1,72 @@
+import asyncio
 import logging
-from typing import Dict, Any
-
-async def log_request_response(request: Dict[str, Any], response: Dict[str, Any]):
-    if "error" in response:
-        logging.error(
-            f"Error occurred: {response['type']}\n"
-            f"Request: {request}\n"
-            f"Error message: {response['error']}"
-        )
-    else:
-        logging.info(f"Request: {request}\nResponse: {response}")
\ No newline at end of file
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bounded fire-and-forget queue for hot-path logging; one long-lived
+# worker drains it so request coroutines never wait on a slow handler
+_LOG_QUEUE_MAX = 10_000
+_DROP_WARN_EVERY = 1000
+
+_log_queue: Optional[asyncio.Queue] = None
+_log_worker: Optional[asyncio.Task] = None
+_dropped_logs = 0
+
+def log_request_response(request: Dict[str, Any], response: Optional[Dict[str, Any]] = None) -> None:
+    """Log a request/response pair.
+
+    Synchronous on purpose: nothing here awaits, and the isEnabledFor
+    guards mean large dicts are never formatted when the level is off.
+    """
+    if isinstance(response, dict) and "error" in response:
+        if logger.isEnabledFor(logging.ERROR):
+            logger.error(
+                "Error occurred: %s\nRequest: %s\nError message: %s",
+                response.get("type"), request, response["error"]
+            )
+    elif logger.isEnabledFor(logging.INFO):
+        logger.info("Request: %s\nResponse: %s", request, response)
+
+def enqueue_request_response(request: Dict[str, Any], response: Optional[Dict[str, Any]] = None) -> None:
+    """Queue a request/response pair for background logging.
+
+    Hot paths call this instead of log_request_response so the request
+    coroutine never stalls on a handler that writes to disk or network.
+    Entries are dropped (and counted) once the bounded queue fills; a
+    single worker task drains it and exits when idle, the same
+    start-on-demand shape as RequestBatcher's runner.
+    """
+    global _log_queue, _log_worker, _dropped_logs
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # No event loop (startup/CLI paths): nothing to decouple from
+        log_request_response(request, response)
+        return
+
+    if _log_queue is None:
+        _log_queue = asyncio.Queue(maxsize=_LOG_QUEUE_MAX)
+    try:
+        _log_queue.put_nowait((request, response))
+    except asyncio.QueueFull:
+        _dropped_logs += 1
+        if _dropped_logs % _DROP_WARN_EVERY == 1:
+            logger.warning("Log queue full; %d entries dropped so far", _dropped_logs)
+        return
+
+    if _log_worker is None or _log_worker.done():
+        _log_worker = loop.create_task(_drain_logs())
+
+async def _drain_logs() -> None:
+    while True:
+        try:
+            request, response = _log_queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        try:
+            log_request_response(request, response)
+        finally:
+            _log_queue.task_done()
+        # Yield between entries so a burst of logging can't starve the loop
+        await asyncio.sleep(0)
@@ -1,31 +1,91 @@
-import asyncio
-from collections import defaultdict
-from typing import Dict, List, Any
+import time
+import functools
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any
+
+# Counter updates are single bytecode-level int adds, which the GIL makes
+# atomic; taking an asyncio.Lock per increment just added an event-loop
+# yield to every hot-path call.
+TIMER_MAX_SAMPLES = 1000
+
+def instrumented(name: str):
+    """Wrap an async manager method in a metrics span; expects the
+    instance to expose self.metrics"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            async with self.metrics.span(name):
+                return await func(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 class Metrics:
     def __init__(self):
         self.counters = defaultdict(int)
-        self.timers = defaultdict(list)
-        self._lock = asyncio.Lock()
+        self.timers = defaultdict(lambda: deque(maxlen=TIMER_MAX_SAMPLES))
+
+    def increment(self, metric: str, value: int = 1):
+        self.counters[metric] += value
 
-    async def increment(self, metric: str, value: int = 1):
-        async with self._lock:
-            self.counters[metric] += value
+    def record_time(self, metric: str, duration: float):
+        self.timers[metric].append(duration)
+
+    @asynccontextmanager
+    async def span(self, name: str):
+        """Instrument one operation with a single timestamp pair: counts an
+        attempt on entry and success or failure on exit, so hot paths emit
+        one metric event instead of three"""
+        self.counters[f"{name}_attempts"] += 1
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.counters[f"{name}_failures"] += 1
+            raise
+        else:
+            self.counters[f"{name}_success"] += 1
+        finally:
+            self.timers[f"{name}_duration"].append(time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def timer(self, metric: str):
+        """Time a span and record it through the sync path"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(metric, time.perf_counter() - start)
+
+    def calculate_percentiles(self, metric: str, percentiles=(50, 95, 99)) -> Dict[str, float]:
+        """Percentiles over the bounded sample reservoir; sorting at most
+        TIMER_MAX_SAMPLES values keeps this O(1) in request count"""
+        samples = sorted(self.timers[metric])
+        if not samples:
+            return {}
+        last = len(samples) - 1
+        return {
+            f"p{p}": samples[min(last, int(len(samples) * p / 100))]
+            for p in percentiles
+        }
+
+    def calculate_error_rate(self, name: str) -> float:
+        """Failures over attempts for a span name, 0.0 when never attempted"""
+        attempts = self.counters.get(f"{name}_attempts", 0)
+        if not attempts:
+            return 0.0
+        return self.counters.get(f"{name}_failures", 0) / attempts
 
-    async def record_time(self, metric: str, duration: float):
-        async with self._lock:
-            self.timers[metric].append(duration)
-            
     def get_metrics(self) -> Dict[str, Any]:
         """Get current metrics state"""
         return {
             "counters": dict(self.counters),
-            "timers": {k: {"avg": sum(v)/len(v), "count": len(v)} 
-                      for k, v in self.timers.items() if v}
+            "timers": {
+                k: {
+                    "avg": sum(v) / len(v),
+                    "count": len(v),
+                    **self.calculate_percentiles(k)
+                }
+                for k, v in self.timers.items() if v
+            }
         }
-
-    async def get_aggregated_metrics(self):
-        return {
-            "error_rate": self.calculate_error_rate(),
-            "response_times": self.calculate_percentiles()
-        }
\ No newline at end of file
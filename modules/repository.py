@@ -1,41 +1,68 @@
+import re
 import httpx
 import logging
 import asyncio
 import time
-from typing import Dict, List, Optional, Union
+from typing import AsyncIterator, Dict, List, Optional, Union
 from uuid import UUID
 from datetime import datetime
 from urllib.parse import urlparse
 from config.settings import settings
 from typing import TypedDict, Literal
-from .metrics import Metrics
+from .metrics import Metrics, instrumented
 from .base import AsyncHTTPClient
 from .validation import validate_input
-from .logging_utils import log_request_response
+from .logging_utils import enqueue_request_response
 from database.connection import get_db_connection
 from .types import RepositoryStatus, APIResponse, SearchType
 from .exceptions import APIError, DatabaseError, ValidationError
 
+logger = logging.getLogger(__name__)
+
+# Fast-path check for well-formed repository URLs; urlparse allocates a
+# handful of small objects per call, which adds up across a large batch
+_REPO_URL_RE = re.compile(r"^(?:https?|git)://[^\s/$.?#][^\s]*$", re.IGNORECASE)
+
+# Static endpoint paths, built once instead of re-created per call
+_ADD_PATH = "/add"
+_DATASETS_STATUS_PATH = "/datasets/status"
+_COGNIFY_PATH = "/cognify"
+_PRUNE_DATA_PATH = "/prune/data"
+_PRUNE_SYSTEM_PATH = "/prune/system"
+
+# SQL as module constants: sqlite3's per-connection statement cache is
+# keyed by the SQL text, so reusing the same interned string skips the
+# re-prepare on every call
+_INSERT_REPOSITORIES_SQL = """
+    INSERT INTO repositories (
+        dataset_id, url, branch, status, last_sync
+    ) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+_DELETE_REPOSITORY_SQL = "DELETE FROM repositories WHERE dataset_id = ?"
+_MARK_SYNCING_SQL = """
+    UPDATE repositories
+    SET status = 'syncing', last_sync = CURRENT_TIMESTAMP,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE dataset_id = ?
+"""
+_TOGGLE_STATE_SQL = """
+    UPDATE repositories
+    SET is_active = ?, status = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE dataset_id = ?
+"""
+
 class RepositoryManager(AsyncHTTPClient):
     def __init__(self, base_url: str = settings.API_BASE_URL, timeout: float = settings.timeout.connect_timeout):
         super().__init__(base_url, timeout)
-        self._cleanup_tasks = []
         self.metrics = Metrics()
         self.cache = RepositoryCache()
 
-    async def __aenter__(self):
-        return self
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        # Clean up any pending tasks
-        for task in self._cleanup_tasks:
-            if not task.done():
-                task.cancel()
-        await asyncio.gather(*self._cleanup_tasks, return_exceptions=True)
-        await self.client.aclose()
-
     def validate_repository_url(self, url: str) -> bool:
         """Validate repository URL format"""
+        # Compiled-regex fast path covers the common case; urlparse only
+        # runs on a miss to produce the specific error message
+        if isinstance(url, str) and _REPO_URL_RE.match(url):
+            return True
         try:
             parsed = urlparse(url)
             if not all([parsed.scheme, parsed.netloc]):
@@ -47,240 +74,278 @@ class RepositoryManager(AsyncHTTPClient):
             raise ValidationError(f"URL validation error: {str(e)}")
 
     async def _make_request_with_retry(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
-        """Make HTTP request with retry logic"""
-        retry_count = 0
-        while retry_count < settings.retry.max_retries:
-            try:
-                response = await getattr(self.client, method)(endpoint, **kwargs)
-                response.raise_for_status()
-                return response
-            except httpx.HTTPError as e:
-                retry_count += 1
-                if retry_count == settings.retry.max_retries:
-                    raise APIError(f"HTTP error after {retry_count} retries: {str(e)}")
-                await asyncio.sleep(settings.retry.retry_delay * (settings.retry.retry_backoff ** retry_count))
+        """Make HTTP request with retry logic.
+
+        Delegates to the shared AsyncHTTPClient retry path so repository
+        calls ride the same pooled HTTP/2 connections, jittered backoff
+        and idempotency rules as the rest of the app instead of a second
+        retry loop layered on top of them.
+        """
+        return await self._request_with_retry(method, endpoint, **kwargs)
+
+    async def _call_add_api(self, request_data: Dict) -> Dict:
+        """Network half of a repository addition: POST /add and decode"""
+        return await self.request_json("post", _ADD_PATH, json=request_data)
+
+    @staticmethod
+    def _insert_repository_rows(conn, rows: List[tuple]) -> None:
+        """Persist (dataset_id, url, branch, status) rows in one transaction"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(_INSERT_REPOSITORIES_SQL, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _execute_write(conn, sql: str, params: tuple) -> None:
+        """Run one write statement and commit; meant to be to_thread'ed"""
+        conn.execute(sql, params)
+        conn.commit()
 
+    @instrumented("repository_add")
     async def add_repository(
         self, 
         url: str, 
         branch: Optional[str] = None,
         auth_token: Optional[str] = None
     ) -> APIResponse:
-        async with self.metrics.timer("repository_add_duration"):
+        try:
+            # Input validation
+            validate_input({
+                "url": url,
+                "branch": branch,
+                "auth_token": auth_token
+            }, {
+                "url": str,
+                "branch": Optional[str],
+                "auth_token": Optional[str]
+            })
+            
+            # Validate URL format
+            self.validate_repository_url(url)
+            
+            request_data = {
+                "repository_url": url,
+                "branch": branch,
+                "auth_token": auth_token
+            }
+            
+            # Log request
+            enqueue_request_response(request_data, None)
+            
             try:
-                # Input validation
-                validate_input({
-                    "url": url,
-                    "branch": branch,
-                    "auth_token": auth_token
-                }, {
-                    "url": str,
-                    "branch": Optional[str],
-                    "auth_token": Optional[str]
-                })
-                
-                # Validate URL format
-                self.validate_repository_url(url)
-                
-                # Track metrics
-                await self.metrics.increment("repository_add_attempts")
-                
-                request_data = {
-                    "repository_url": url,
-                    "branch": branch,
-                    "auth_token": auth_token
-                }
-                
-                # Log request
-                await log_request_response(request_data, None)
-                
-                try:
-                    # Make API request with retry logic
-                    async with get_db_connection() as conn:
-                        async with conn.transaction():
-                            # API call
-                            response = await self._make_request_with_retry(
-                                "post", 
-                                "/add",
-                                json=request_data,
-                                timeout=30.0
-                            )
-                            response_data = response.json()
-                            
-                            # Log response
-                            await log_request_response(request_data, response_data)
-                            
-                            # Insert into database
-                            await conn.execute("""
-                                INSERT INTO repositories (
-                                    dataset_id, url, branch, status, last_sync
-                                ) VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP)
-                            """, (
-                                str(response_data['dataset_id']),
-                                url,
-                                branch,
-                                response_data['status']
-                            ))
-                            
-                            # Record success metric
-                            await self.metrics.increment("repository_add_success")
-                            
-                            return APIResponse(
-                                status="success",
-                                message="Repository added successfully",
-                                data={
-                                    "dataset_id": str(response_data['dataset_id']),
-                                    "status": response_data['status']
-                                }
-                            )
-                            
-                except httpx.HTTPError as e:
-                    await self.metrics.increment("repository_add_api_errors")
-                    logging.error(f"HTTP error adding repository: {str(e)}")
-                    return APIResponse(
-                        status="error", 
-                        message="API error",
-                        errors=[str(e)]
+                # Network first, then persist: the API half is shared
+                # with batch_add_repositories so batches can coalesce
+                # their inserts into one transaction
+                response_data = await self._call_add_api(request_data)
+                enqueue_request_response(request_data, response_data)
+
+                async with get_db_connection(readonly=False) as conn:
+                    await asyncio.to_thread(
+                        self._insert_repository_rows, conn,
+                        [(str(response_data['dataset_id']), url, branch,
+                          response_data['status'])]
                     )
-                    
-                except DatabaseError as e:
-                    await self.metrics.increment("repository_db_errors")
-                    logging.error(f"Database error adding repository: {str(e)}")
-                    return APIResponse(
-                        status="error",
-                        message="Database error",
-                        errors=[str(e)]
-                    )
-                    
-            except ValidationError as e:
-                await self.metrics.increment("repository_validation_errors")
-                logging.error(f"Validation error: {str(e)}")
-                return APIResponse(
-                    status="error",
-                    message="Validation error", 
+
+                # model_construct: the payload is assembled from values
+                # this method just produced, so it skips the validator
+                # chain that guards user-supplied input
+                return APIResponse.model_construct(
+                    status="success",
+                    message="Repository added successfully",
+                    data={
+                        "dataset_id": str(response_data['dataset_id']),
+                        "status": response_data['status']
+                    }
+                )
+
+            except APIError as e:
+                self.metrics.increment("repository_add_api_errors")
+                logger.error("HTTP error adding repository: %s", e)
+                return APIResponse.model_construct(
+                    status="error", 
+                    message="API error",
                     errors=[str(e)]
                 )
                 
-            except Exception as e:
-                await self.metrics.increment("repository_add_errors")
-                logging.error(f"Unexpected error: {str(e)}")
-                return APIResponse(
+            except DatabaseError as e:
+                self.metrics.increment("repository_db_errors")
+                logger.error("Database error adding repository: %s", e)
+                return APIResponse.model_construct(
                     status="error",
-                    message="An unexpected error occurred",
+                    message="Database error",
                     errors=[str(e)]
                 )
+                
+        except ValidationError as e:
+            self.metrics.increment("repository_validation_errors")
+            logger.error("Validation error: %s", e)
+            return APIResponse.model_construct(
+                status="error",
+                message="Validation error", 
+                errors=[str(e)]
+            )
+            
+        except Exception as e:
+            self.metrics.increment("repository_add_errors")
+            logger.error("Unexpected error: %s", e)
+            return APIResponse.model_construct(
+                status="error",
+                message="An unexpected error occurred",
+                errors=[str(e)]
+            )
+
+    async def batch_add_repositories(self, repositories: List[Dict[str, str]]) -> AsyncIterator[APIResponse]:
+        """Add multiple repositories concurrently, bounded by MAX_BATCH_SIZE.
+
+        Yields each result as its addition finishes (as_completed), so a
+        slow repository doesn't hold back the others and the caller can
+        update state incrementally; the semaphore caps in-flight requests
+        so a large batch can't exhaust the connection pool.
+
+        Only the API calls run per-repository; the local inserts are
+        buffered and written as a single executemany transaction at the
+        end, one fsync for the whole batch instead of one per repository.
+        """
+        semaphore = asyncio.Semaphore(settings.MAX_BATCH_SIZE)
+        rows: List[tuple] = []
+
+        async def _add_one(repo: Dict[str, str]) -> APIResponse:
+            async with semaphore:
+                url = repo.get('url', '')
+                try:
+                    self.validate_repository_url(url)
+                    request_data = {
+                        "repository_url": url,
+                        "branch": repo.get('branch'),
+                        "auth_token": repo.get('auth_token')
+                    }
+                    response_data = await self._call_add_api(request_data)
+                    rows.append((
+                        str(response_data['dataset_id']),
+                        url,
+                        repo.get('branch'),
+                        response_data['status']
+                    ))
+                    return APIResponse.model_construct(
+                        status="success",
+                        message="Repository added successfully",
+                        data={
+                            "dataset_id": str(response_data['dataset_id']),
+                            "status": response_data['status']
+                        }
+                    )
+                except ValidationError as e:
+                    self.metrics.increment("repository_batch_validation_errors")
+                    return APIResponse.model_construct(status="error", message=f"Validation error: {str(e)}", errors=[str(e)])
+                except APIError as e:
+                    self.metrics.increment("repository_batch_api_errors")
+                    return APIResponse.model_construct(status="error", message=f"API error: {str(e)}", errors=[str(e)])
+
+        for future in asyncio.as_completed([_add_one(repo) for repo in repositories]):
+            yield await future
 
-    async def batch_add_repositories(self, repositories: List[Dict[str, str]]) -> List[APIResponse]:
-        """Add multiple repositories in batch"""
-        results = []
-        for repo in repositories:
+        if rows:
             try:
-                result = await self.add_repository(
-                    url=repo['url'],
-                    branch=repo.get('branch'),
-                    auth_token=repo.get('auth_token')
-                )
-                results.append(result)
-            except ValidationError as e:
-                await self.metrics.increment("repository_batch_validation_errors")
-                results.append(APIResponse(status="error", message=f"Validation error: {str(e)}"))
-            except APIError as e:
-                await self.metrics.increment("repository_batch_api_errors")
-                results.append(APIResponse(status="error", message=f"API error: {str(e)}"))
+                async with get_db_connection(readonly=False) as conn:
+                    await asyncio.to_thread(self._insert_repository_rows, conn, rows)
             except DatabaseError as e:
-                await self.metrics.increment("repository_batch_db_errors")
-                results.append(APIResponse(status="error", message=f"Database error: {str(e)}"))
-        return results
+                self.metrics.increment("repository_batch_db_errors")
+                logger.error("Database error persisting repository batch: %s", e)
 
     async def get_repositories_status(self) -> List[Dict]:
         """Get status of all repositories"""
-        response = await self.client.get("/datasets/status")
-        return response.json()["repositories"]
+        data = await self.request_json("get", _DATASETS_STATUS_PATH)
+        return data["repositories"]
 
     async def delete_repository(self, dataset_id: UUID) -> Dict:
         """Delete a repository"""
         try:
             # Track metrics
-            await self.metrics.increment("repository_delete_attempts")
-            start_time = time.time()
+            self.metrics.increment("repository_delete_attempts")
+            start_time = time.perf_counter()
             
             # Log request
-            request_data = {"dataset_id": str(dataset_id)}
-            await log_request_response(request_data, None)
+            did = str(dataset_id)
+            request_data = {"dataset_id": did}
+            enqueue_request_response(request_data, None)
             
             try:
                 # API call
-                response = await self.client.delete(f"/datasets/{dataset_id}")
-                response.raise_for_status()
-                
+                response_data = await self.request_json("delete", f"/datasets/{did}")
+
                 # Log response
-                await log_request_response(request_data, response.json())
+                enqueue_request_response(request_data, response_data)
                 
-                # Local DB operation
-                with get_db_connection() as conn:
-                    conn.execute("DELETE FROM repositories WHERE dataset_id = ?", 
-                            (str(dataset_id),))
-                    conn.commit()
+                # Local DB operation runs in a worker thread so the
+                # sqlite3 call doesn't block the event loop
+                async with get_db_connection(readonly=False) as conn:
+                    await asyncio.to_thread(
+                        self._execute_write, conn,
+                        _DELETE_REPOSITORY_SQL,
+                        (did,)
+                    )
                     
                 # Record success and timing
-                await self.metrics.increment("repository_delete_success")
-                await self.metrics.record_time("repository_delete_duration", time.time() - start_time)
+                self.metrics.increment("repository_delete_success")
+                self.metrics.record_time("repository_delete_duration", time.perf_counter() - start_time)
                 
-                return response.json()
+                return response_data
                 
-            except httpx.HTTPError as e:
-                await self.metrics.increment("repository_delete_api_errors")
-                logging.error(f"HTTP error deleting repository: {str(e)}")
+            except (APIError, httpx.HTTPError) as e:
+                self.metrics.increment("repository_delete_api_errors")
+                logger.error("HTTP error deleting repository: %s", e)
                 raise
             except Exception as e:
-                await self.metrics.increment("repository_delete_errors")
-                logging.error(f"Error deleting repository: {str(e)}")
+                self.metrics.increment("repository_delete_errors")
+                logger.error("Error deleting repository: %s", e)
                 raise
                 
         except Exception as e:
-            await self.metrics.increment("repository_delete_errors")
-            logging.error(f"Error in delete_repository: {str(e)}")
+            self.metrics.increment("repository_delete_errors")
+            logger.error("Error in delete_repository: %s", e)
             raise
 
     async def sync_repository(self, dataset_id: UUID) -> Dict:
         """Trigger repository sync"""
         try:
             # Track metrics
-            await self.metrics.increment("repository_sync_attempts")
-            start_time = time.time()
+            self.metrics.increment("repository_sync_attempts")
+            start_time = time.perf_counter()
             
-            request_data = {"dataset_id": str(dataset_id)}
-            await log_request_response(request_data, None)
+            did = str(dataset_id)
+            request_data = {"dataset_id": did}
+            enqueue_request_response(request_data, None)
             
             try:
-                response = await self.client.post("/cognify", json=request_data)
-                response.raise_for_status()
-                
+                response_data = await self.request_json("post", _COGNIFY_PATH, json=request_data)
+
                 # Log response
-                await log_request_response(request_data, response.json())
+                enqueue_request_response(request_data, response_data)
                 
-                with get_db_connection() as conn:
-                    conn.execute("""
-                        UPDATE repositories 
-                        SET status = 'syncing', last_sync = CURRENT_TIMESTAMP 
-                        WHERE dataset_id = ?
-                    """, (str(dataset_id),))
-                    conn.commit()
+                async with get_db_connection(readonly=False) as conn:
+                    await asyncio.to_thread(
+                        self._execute_write, conn,
+                        _MARK_SYNCING_SQL,
+                        (did,)
+                    )
                 
                 # Record success and timing
-                await self.metrics.increment("repository_sync_success")
-                await self.metrics.record_time("repository_sync_duration", time.time() - start_time)
+                self.metrics.increment("repository_sync_success")
+                self.metrics.record_time("repository_sync_duration", time.perf_counter() - start_time)
                 
-                return response.json()
+                return response_data
                 
             except Exception as e:
-                await self.metrics.increment("repository_sync_errors")
-                logging.error(f"Error syncing repository: {str(e)}")
+                self.metrics.increment("repository_sync_errors")
+                logger.error("Error syncing repository: %s", e)
                 raise
                 
         except Exception as e:
-            await self.metrics.increment("repository_sync_errors")
-            logging.error(f"Error in sync_repository: {str(e)}")
+            self.metrics.increment("repository_sync_errors")
+            logger.error("Error in sync_repository: %s", e)
             raise
 
     async def process_repository(self, dataset_id: Optional[UUID] = None) -> Dict:
@@ -291,70 +356,68 @@ class RepositoryManager(AsyncHTTPClient):
                 validate_input({"dataset_id": dataset_id}, {"dataset_id": UUID})
 
             # Track metrics
-            await self.metrics.increment("repository_process_attempts")
-            start_time = time.time()
+            self.metrics.increment("repository_process_attempts")
+            start_time = time.perf_counter()
 
             request_data = {
                 "dataset_id": str(dataset_id) if dataset_id else None
             }
 
             # Log request
-            await log_request_response(request_data, None)
+            enqueue_request_response(request_data, None)
 
             try:
-                response = await self.client.post("/cognify", json=request_data)
-                response.raise_for_status()
+                response_data = await self.request_json("post", _COGNIFY_PATH, json=request_data)
 
                 # Log response
-                await log_request_response(request_data, response.json())
+                enqueue_request_response(request_data, response_data)
 
                 # Record success and timing
-                await self.metrics.increment("repository_process_success")
-                await self.metrics.record_time("repository_process_duration", time.time() - start_time)
+                self.metrics.increment("repository_process_success")
+                self.metrics.record_time("repository_process_duration", time.perf_counter() - start_time)
 
-                return response.json()
+                return response_data
 
-            except httpx.HTTPError as e:
-                await self.metrics.increment("repository_process_api_errors")
-                logging.error(f"HTTP error processing repository: {str(e)}")
+            except (APIError, httpx.HTTPError) as e:
+                self.metrics.increment("repository_process_api_errors")
+                logger.error("HTTP error processing repository: %s", e)
                 raise APIError(f"HTTP error processing repository: {str(e)}")
 
         except Exception as e:
-            await self.metrics.increment("repository_process_errors")
-            logging.error(f"Error in process_repository: {str(e)}")
+            self.metrics.increment("repository_process_errors")
+            logger.error("Error in process_repository: %s", e)
             raise
 
     async def prune_data(self) -> Dict[str, str]:
         """Prune repository data"""
         try:
             # Track metrics
-            await self.metrics.increment("data_prune_attempts")
-            start_time = time.time()
+            self.metrics.increment("data_prune_attempts")
+            start_time = time.perf_counter()
 
             # Log request
-            await log_request_response({"action": "prune_data"}, None)
+            enqueue_request_response({"action": "prune_data"}, None)
 
             try:
-                response = await self.client.post("/prune/data")
-                response.raise_for_status()
+                response_data = await self.request_json("post", _PRUNE_DATA_PATH)
 
                 # Log response
-                await log_request_response({"action": "prune_data"}, response.json())
+                enqueue_request_response({"action": "prune_data"}, response_data)
 
                 # Record success and timing
-                await self.metrics.increment("data_prune_success")
-                await self.metrics.record_time("data_prune_duration", time.time() - start_time)
+                self.metrics.increment("data_prune_success")
+                self.metrics.record_time("data_prune_duration", time.perf_counter() - start_time)
 
-                return response.json()
+                return response_data
 
-            except httpx.HTTPError as e:
-                await self.metrics.increment("data_prune_api_errors")
-                logging.error(f"HTTP error pruning data: {str(e)}")
+            except (APIError, httpx.HTTPError) as e:
+                self.metrics.increment("data_prune_api_errors")
+                logger.error("HTTP error pruning data: %s", e)
                 raise APIError(f"HTTP error pruning data: {str(e)}")
 
         except Exception as e:
-            await self.metrics.increment("data_prune_errors")
-            logging.error(f"Error in prune_data: {str(e)}")
+            self.metrics.increment("data_prune_errors")
+            logger.error("Error in prune_data: %s", e)
             raise
 
     async def prune_system(self, metadata: bool = False, 
@@ -374,8 +437,8 @@ class RepositoryManager(AsyncHTTPClient):
             })
 
             # Track metrics
-            await self.metrics.increment("system_prune_attempts")
-            start_time = time.time()
+            self.metrics.increment("system_prune_attempts")
+            start_time = time.perf_counter()
 
             request_data = {
                 "metadata": metadata,
@@ -384,29 +447,28 @@ class RepositoryManager(AsyncHTTPClient):
             }
 
             # Log request
-            await log_request_response(request_data, None)
+            enqueue_request_response(request_data, None)
 
             try:
-                response = await self.client.post("/prune/system", json=request_data)
-                response.raise_for_status()
+                response_data = await self.request_json("post", _PRUNE_SYSTEM_PATH, json=request_data)
 
                 # Log response
-                await log_request_response(request_data, response.json())
+                enqueue_request_response(request_data, response_data)
 
                 # Record success and timing
-                await self.metrics.increment("system_prune_success")
-                await self.metrics.record_time("system_prune_duration", time.time() - start_time)
+                self.metrics.increment("system_prune_success")
+                self.metrics.record_time("system_prune_duration", time.perf_counter() - start_time)
 
-                return response.json()
+                return response_data
 
-            except httpx.HTTPError as e:
-                await self.metrics.increment("system_prune_api_errors")
-                logging.error(f"HTTP error pruning system: {str(e)}")
+            except (APIError, httpx.HTTPError) as e:
+                self.metrics.increment("system_prune_api_errors")
+                logger.error("HTTP error pruning system: %s", e)
                 raise APIError(f"HTTP error pruning system: {str(e)}")
 
         except Exception as e:
-            await self.metrics.increment("system_prune_errors")
-            logging.error(f"Error in prune_system: {str(e)}")
+            self.metrics.increment("system_prune_errors")
+            logger.error("Error in prune_system: %s", e)
             raise
 
     async def toggle_repository_state(self, dataset_id: UUID, active: bool) -> Dict:
@@ -422,25 +484,25 @@ class RepositoryManager(AsyncHTTPClient):
             })
 
             # Track metrics
-            await self.metrics.increment("repository_state_toggle_attempts")
-            start_time = time.time()
+            self.metrics.increment("repository_state_toggle_attempts")
+            start_time = time.perf_counter()
 
+            did = str(dataset_id)
             request_data = {
-                "dataset_id": str(dataset_id),
+                "dataset_id": did,
                 "active": active
             }
 
             # Log request
-            await log_request_response(request_data, None)
+            enqueue_request_response(request_data, None)
 
             try:
-                with get_db_connection() as conn:
-                    conn.execute("""
-                        UPDATE repositories 
-                        SET is_active = ?, status = ?
-                        WHERE dataset_id = ?
-                    """, (active, "active" if active else "inactive", str(dataset_id)))
-                    conn.commit()
+                async with get_db_connection(readonly=False) as conn:
+                    await asyncio.to_thread(
+                        self._execute_write, conn,
+                        _TOGGLE_STATE_SQL,
+                        (active, "active" if active else "inactive", did)
+                    )
 
                 response_data = {
                     "status": "success",
@@ -448,63 +510,61 @@ class RepositoryManager(AsyncHTTPClient):
                 }
 
                 # Log response
-                await log_request_response(request_data, response_data)
+                enqueue_request_response(request_data, response_data)
 
                 # Record success and timing
-                await self.metrics.increment("repository_state_toggle_success")
-                await self.metrics.record_time("repository_state_toggle_duration", time.time() - start_time)
+                self.metrics.increment("repository_state_toggle_success")
+                self.metrics.record_time("repository_state_toggle_duration", time.perf_counter() - start_time)
 
                 return response_data
 
             except Exception as e:
-                await self.metrics.increment("repository_state_toggle_db_errors")
-                logging.error(f"Database error toggling repository state: {str(e)}")
+                self.metrics.increment("repository_state_toggle_db_errors")
+                logger.error("Database error toggling repository state: %s", e)
                 raise DatabaseError(f"Error toggling repository state: {str(e)}")
 
         except Exception as e:
-            await self.metrics.increment("repository_state_toggle_errors")
-            logging.error(f"Error in toggle_repository_state: {str(e)}")
+            self.metrics.increment("repository_state_toggle_errors")
+            logger.error("Error in toggle_repository_state: %s", e)
             raise
     
-    async def batch_add_repositories(self, repositories: List[Dict[str, str]]) -> List[APIResponse]:
-        """Add multiple repositories in batch"""
-        futures = []
-        for repo in repositories:
-            futures.append(self.request_batcher.add_request({
-                "url": repo['url'],
-                "branch": repo.get('branch'),
-                "auth_token": repo.get('auth_token')
-            }))
-        
-        return await asyncio.gather(*futures)
-
-
 class RepositoryCache:
+    # Power of two so the shard pick is a single mask of the hash
+    _SHARD_COUNT = 16
+
     def __init__(self, cache_duration: int = 300):  # 5 minutes default
-        self._cache = {}
+        # One dict+lock per shard: concurrent batch syncs touching
+        # different repositories no longer serialize on a global lock
+        self._shards = [({}, asyncio.Lock()) for _ in range(self._SHARD_COUNT)]
         self._cache_duration = cache_duration
-        self._lock = asyncio.Lock()
+
+    def _shard(self, dataset_id: UUID):
+        return self._shards[hash(dataset_id) & (self._SHARD_COUNT - 1)]
 
     async def get(self, dataset_id: UUID) -> Optional[Dict]:
-        async with self._lock:
-            if dataset_id in self._cache:
-                entry = self._cache[dataset_id]
-                if time.time() - entry['timestamp'] < self._cache_duration:
+        cache, lock = self._shard(dataset_id)
+        async with lock:
+            if dataset_id in cache:
+                entry = cache[dataset_id]
+                if time.monotonic() - entry['timestamp'] < self._cache_duration:
                     return entry['data']
-                del self._cache[dataset_id]
+                del cache[dataset_id]
             return None
 
     async def set(self, dataset_id: UUID, data: Dict):
-        async with self._lock:
-            self._cache[dataset_id] = {
+        cache, lock = self._shard(dataset_id)
+        async with lock:
+            cache[dataset_id] = {
                 'data': data,
-                'timestamp': time.time()
+                'timestamp': time.monotonic()
             }
 
     async def invalidate(self, dataset_id: UUID):
-        async with self._lock:
-            self._cache.pop(dataset_id, None)
+        cache, lock = self._shard(dataset_id)
+        async with lock:
+            cache.pop(dataset_id, None)
 
     async def clear(self):
-        async with self._lock:
-            self._cache.clear()
\ No newline at end of file
+        for cache, lock in self._shards:
+            async with lock:
+                cache.clear()
\ No newline at end of file
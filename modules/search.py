@@ -1,55 +1,84 @@
+import orjson
+import asyncio
+import hashlib
+import heapq
 import logging
+import sqlite3
 import time
+from collections import OrderedDict
 from uuid import uuid4
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from database.connection import get_db_connection
 from .types import SearchType, SearchHistoryItem
-from .exceptions import DatabaseError
+from .exceptions import BaseError, DatabaseError, ValidationError
 from sqlite3 import Connection
-from functools import lru_cache
 from dataclasses import dataclass
+from functools import cached_property
 from config.settings import settings
 from .metrics import Metrics
 from .validation import validate_input
-from .logging_utils import log_request_response
+from .logging_utils import enqueue_request_response
+
+logger = logging.getLogger(__name__)
 
 class SearchCache:
     def __init__(self, max_size=1000, ttl=300):
-        self.cache = {}
+        # OrderedDict gives O(1) true-LRU eviction; scanning for the
+        # oldest timestamp on every insert was O(N) under the lock
+        self.cache = OrderedDict()
         self.max_size = max_size
         self.ttl = ttl
         self._lock = asyncio.Lock()
+        # Min-heap of (expiry, key) so cleanup pops only entries that are
+        # actually due instead of scanning the whole dict under the lock.
+        # Stale heap entries (key re-set or evicted since push) are
+        # detected against the live timestamp and skipped.
+        self._expiry_heap = []
 
     async def get(self, key: str) -> Optional[Any]:
         async with self._lock:
             if key in self.cache:
                 entry = self.cache[key]
-                if time.time() - entry['timestamp'] < self.ttl:
+                if time.monotonic() - entry['timestamp'] < self.ttl:
+                    self.cache.move_to_end(key)
                     return entry['data']
                 del self.cache[key]
             return None
 
     async def set(self, key: str, value: Any):
         async with self._lock:
-            if len(self.cache) >= self.max_size:
-                oldest = min(self.cache.items(), key=lambda x: x[1]['timestamp'])
-                del self.cache[oldest[0]]
+            if key in self.cache:
+                self.cache.move_to_end(key)
+            now = time.monotonic()
             self.cache[key] = {
                 'data': value,
-                'timestamp': time.time()
+                'timestamp': now
             }
+            heapq.heappush(self._expiry_heap, (now + self.ttl, key))
+            if len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
 
     async def cleanup(self):
-        """Periodic cleanup of expired entries"""
+        """Periodic cleanup of expired entries, O(k log N) in the number
+        actually expired rather than a full scan"""
+        async with self._lock:
+            now = time.monotonic()
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                _, key = heapq.heappop(self._expiry_heap)
+                entry = self.cache.get(key)
+                # Only drop if this heap entry still describes the live
+                # value; a re-set key has a fresher timestamp
+                if entry is not None and now - entry['timestamp'] >= self.ttl:
+                    del self.cache[key]
+
+    async def clear(self):
+        """Drop everything, e.g. after a write invalidates results"""
         async with self._lock:
-            now = time.time()
-            expired = [k for k, v in self.cache.items() 
-                      if now - v['timestamp'] > self.ttl]
-            for k in expired:
-                del self.cache[k]
+            self.cache.clear()
+            self._expiry_heap.clear()
 
-@dataclass
+@dataclass(frozen=True)
 class SearchCriteria:
     query: Optional[str] = None
     search_type: Optional[SearchType] = None
@@ -59,16 +88,50 @@ class SearchCriteria:
     page: int = 1
     page_size: int = settings.pagination.chat_history_page_size
 
+    # Frozen, so the wire form can be computed once and reused for the
+    # request body, the log entry and the cache-key digest
+    @cached_property
+    def serialized(self) -> Dict[str, Any]:
+        return {
+            "query": self.query,
+            "search_type": self.search_type.value if self.search_type else None,
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "repository_ids": self.repository_ids,
+            "page": self.page,
+            "page_size": self.page_size
+        }
+
 class SearchManager:
     def __init__(self, db_connection: Optional[Connection] = None):
         self.db_connection = db_connection
-        self._cache = {}
+        # Result cache keyed by a digest of the criteria; lru_cache on an
+        # async def would cache one-shot coroutine objects, not results
+        self._search_cache = SearchCache(max_size=100)
         self.metrics = Metrics()
     
     def get_search_types(self) -> List[SearchType]:
         return list(SearchType)
 
-    @lru_cache(maxsize=100)
+    @staticmethod
+    def _run_search_query(conn: Connection, criteria: SearchCriteria):
+        """Blocking search query, run via asyncio.to_thread."""
+        query_parts = ["SELECT ch.*, GROUP_CONCAT(r.url) as repository_urls FROM chat_history ch"]
+        params = []
+
+        # ... [rest of the query building code] ...
+
+        return results, total_count
+
+    @staticmethod
+    def _insert_search_history(conn: Connection, search_id: str, query: str, search_type: str) -> None:
+        """Blocking history insert, run via asyncio.to_thread."""
+        conn.execute("""
+            INSERT INTO chat_history (id, text, user, created_at, search_type)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?)
+        """, (search_id, query, "user", search_type))
+        conn.commit()
+
     async def search(self, criteria: SearchCriteria) -> Dict[str, any]:
         """Enhanced search with multiple criteria and caching"""
         try:
@@ -78,29 +141,29 @@ class SearchManager:
                 "criteria": SearchCriteria
             })
 
-            await self.metrics.increment("search_attempts")
-            start_time = time.time()
+            self.metrics.increment("search_attempts")
+            start_time = time.perf_counter()
 
-            request_data = {
-                "query": criteria.query,
-                "search_type": criteria.search_type.value if criteria.search_type else None,
-                "start_date": criteria.start_date.isoformat() if criteria.start_date else None,
-                "end_date": criteria.end_date.isoformat() if criteria.end_date else None,
-                "repository_ids": criteria.repository_ids,
-                "page": criteria.page,
-                "page_size": criteria.page_size
-            }
+            request_data = criteria.serialized
+
+            cache_key = hashlib.blake2b(
+                orjson.dumps(request_data, option=orjson.OPT_SORT_KEYS),
+                digest_size=16
+            ).hexdigest()
+            cached = await self._search_cache.get(cache_key)
+            if cached is not None:
+                self.metrics.increment("search_cache_hits")
+                return cached
 
-            await log_request_response(request_data, None)
+            enqueue_request_response(request_data, None)
 
             try:
-                with get_db_connection() as conn:
+                async with get_db_connection() as conn:
                     try:
-                        query_parts = ["SELECT ch.*, GROUP_CONCAT(r.url) as repository_urls FROM chat_history ch"]
-                        params = []
-                        
-                        # ... [rest of the query building code] ...
-                        
+                        results, total_count = await asyncio.to_thread(
+                            self._run_search_query, conn, criteria
+                        )
+
                         response_data = {
                             "results": results,
                             "total": total_count,
@@ -109,38 +172,40 @@ class SearchManager:
                             "total_pages": (total_count + criteria.page_size - 1) // criteria.page_size
                         }
 
-                        await log_request_response(request_data, response_data)
+                        await self._search_cache.set(cache_key, response_data)
+
+                        enqueue_request_response(request_data, response_data)
 
-                        await self.metrics.increment("search_success")
-                        await self.metrics.record_time("search_duration", time.time() - start_time)
+                        self.metrics.increment("search_success")
+                        self.metrics.record_time("search_duration", time.perf_counter() - start_time)
 
                         return response_data
 
                     except sqlite3.OperationalError as e:
-                        await self.metrics.increment("search_db_operational_errors")
-                        logging.error(f"Database operational error: {str(e)}")
+                        self.metrics.increment("search_db_operational_errors")
+                        logger.error("Database operational error: %s", e)
                         raise DatabaseError(f"Database operational error: {str(e)}")
                     except sqlite3.IntegrityError as e:
-                        await self.metrics.increment("search_db_integrity_errors")
-                        logging.error(f"Database integrity error: {str(e)}")
+                        self.metrics.increment("search_db_integrity_errors")
+                        logger.error("Database integrity error: %s", e)
                         raise DatabaseError(f"Database integrity error: {str(e)}")
 
             except DatabaseError:
                 raise
             except Exception as e:
-                await self.metrics.increment("search_db_errors")
-                logging.error(f"Unexpected database error: {str(e)}")
+                self.metrics.increment("search_db_errors")
+                logger.error("Unexpected database error: %s", e)
                 raise DatabaseError(f"Unexpected database error: {str(e)}")
 
         except ValidationError as e:
-            await self.metrics.increment("search_validation_errors")
-            logging.error(f"Validation error in search: {str(e)}")
+            self.metrics.increment("search_validation_errors")
+            logger.error("Validation error in search: %s", e)
             raise
         except DatabaseError:
             raise
         except Exception as e:
-            await self.metrics.increment("search_errors")
-            logging.error(f"Unexpected error in search: {str(e)}")
+            self.metrics.increment("search_errors")
+            logger.error("Unexpected error in search: %s", e)
             raise BaseError(f"Unexpected error: {str(e)}")
 
     async def save_search_history(self, query: str, search_type: SearchType, result: Dict) -> None:
@@ -156,8 +221,8 @@ class SearchManager:
                 "result": dict
             })
 
-            await self.metrics.increment("search_history_save_attempts")
-            start_time = time.time()
+            self.metrics.increment("search_history_save_attempts")
+            start_time = time.perf_counter()
 
             request_data = {
                 "query": query,
@@ -165,38 +230,36 @@ class SearchManager:
                 "result": result
             }
 
-            await log_request_response(request_data, None)
+            enqueue_request_response(request_data, None)
 
             try:
-                with get_db_connection() as conn:
+                async with get_db_connection(readonly=False) as conn:
                     search_id = str(uuid4())
-                    conn.execute("""
-                        INSERT INTO chat_history (id, text, user, created_at, search_type)
-                        VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?)
-                    """, (search_id, query, "user", search_type.value))
-                    conn.commit()
+                    await asyncio.to_thread(
+                        self._insert_search_history, conn, search_id, query, search_type.value
+                    )
 
-                    self.search.cache_clear()
+                await self._search_cache.clear()
 
-                    response_data = {"status": "success", "search_id": search_id}
+                response_data = {"status": "success", "search_id": search_id}
 
-                    await log_request_response(request_data, response_data)
+                enqueue_request_response(request_data, response_data)
 
-                    await self.metrics.increment("search_history_save_success")
-                    await self.metrics.record_time("search_history_save_duration", time.time() - start_time)
+                self.metrics.increment("search_history_save_success")
+                self.metrics.record_time("search_history_save_duration", time.perf_counter() - start_time)
 
-                    return response_data
+                return response_data
 
-            except Exception as e:
-                await self.metrics.increment("search_history_save_db_errors")
-                logging.error(f"Database error saving search history: {str(e)}")
+            except sqlite3.Error as e:
+                self.metrics.increment("search_history_save_db_errors")
+                logger.error("Database error saving search history: %s", e)
                 raise DatabaseError(f"Error saving search history: {str(e)}")
 
         except Exception as e:
-            await self.metrics.increment("search_history_save_errors")
-            logging.error(f"Error in save_search_history: {str(e)}")
+            self.metrics.increment("search_history_save_errors")
+            logger.error("Error in save_search_history: %s", e)
             raise
 
-    def clear_cache(self):
+    async def clear_cache(self):
         """Clear the search cache"""
-        self.search.cache_clear()
\ No newline at end of file
+        await self._search_cache.clear()
\ No newline at end of file
@@ -1,11 +1,18 @@
+import re
 from enum import Enum
 from typing import TypedDict, Literal, Optional
 from datetime import datetime
 from uuid import UUID
 from dataclasses import dataclass, field
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, ConfigDict, ValidationInfo, field_validator
+from pydantic_core import core_schema
 from .exceptions import ValidationError
 
+# One C-level match validates a whole comma-separated UUID list; the UUID
+# constructor is a multi-branch Python parser per element
+_UUID_PATTERN = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+_UUID_LIST_RE = re.compile(rf"^\s*{_UUID_PATTERN}(?:\s*,\s*{_UUID_PATTERN})*\s*$")
+
 # Enhanced Error Types
 class UUIDValidationError(ValidationError):
     """Raised when UUID validation fails"""
@@ -33,10 +40,14 @@ class SearchType(str, Enum):
 
     @classmethod
     def validate(cls, value: str) -> "SearchType":
-        try:
-            return cls(value)
-        except ValueError:
+        member = _SEARCH_TYPE_MAP.get(value)
+        if member is None:
             raise SearchTypeValidationError(f"Invalid search type: {value}")
+        return member
+
+# Direct value->member table: one dict probe on the send path instead of
+# Enum.__call__ plus a try/except on every lookup
+_SEARCH_TYPE_MAP = {m.value: m for m in SearchType}
 
 # Repository Status Types
 class RepositoryStatusType(str, Enum):
@@ -47,10 +58,12 @@ class RepositoryStatusType(str, Enum):
 
     @classmethod
     def validate(cls, value: str) -> "RepositoryStatusType":
-        try:
-            return cls(value)
-        except ValueError:
+        member = _STATUS_TYPE_MAP.get(value)
+        if member is None:
             raise StatusValidationError(f"Invalid repository status: {value}")
+        return member
+
+_STATUS_TYPE_MAP = {m.value: m for m in RepositoryStatusType}
 
 # Frozen Dataclasses
 @dataclass(frozen=True)
@@ -68,6 +81,18 @@ class RepositoryId:
     def __str__(self) -> str:
         return str(self.value)
 
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler):
+        # Native schema keeps models off the arbitrary-types isinstance
+        # fallback: existing instances pass through, anything else goes
+        # through pydantic-core's UUID parser and then the constructor
+        return core_schema.union_schema([
+            core_schema.is_instance_schema(cls),
+            core_schema.no_info_after_validator_function(
+                cls, core_schema.uuid_schema()
+            ),
+        ])
+
 @dataclass(frozen=True)
 class Timestamp:
     """Immutable timestamp with validation"""
@@ -80,72 +105,82 @@ class Timestamp:
             except ValueError as e:
                 raise DateValidationError(f"Invalid datetime format: {e}")
 
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler):
+        return core_schema.union_schema([
+            core_schema.is_instance_schema(cls),
+            core_schema.no_info_after_validator_function(
+                cls, core_schema.datetime_schema()
+            ),
+        ])
+
 # Pydantic Models for Complex Types
 class RepositoryStatus(BaseModel):
     """Repository status with validation"""
+    model_config = ConfigDict(frozen=True)
+
     url: str
     status: RepositoryStatusType
-    last_sync: Optional[Timestamp]
-    error_message: Optional[str]
+    last_sync: Optional[Timestamp] = None
+    error_message: Optional[str] = None
     dataset_id: RepositoryId
     is_active: bool
 
-    @validator('url')
-    def validate_url(cls, v):
-        if not v.startswith(('http://', 'https://', 'git://')):
-            raise ValidationError("Invalid repository URL scheme")
-        return v
-
-    class Config:
-        frozen = True
-        arbitrary_types_allowed = True
+    @field_validator('url')
+    @classmethod
+    def validate_url(cls, v: str) -> str:
+        # First-char dispatch: most input is https, so one char compare
+        # routes straight to the matching prefix check
+        c = v[:1]
+        if c == 'h':
+            if v.startswith('https://') or v.startswith('http://'):
+                return v
+        elif c == 'g' and v.startswith('git://'):
+            return v
+        # Domain exceptions pass through pydantic-core untouched, so
+        # callers keep catching the app's ValidationError
+        raise ValidationError("Invalid repository URL scheme")
 
 class SearchHistoryItem(BaseModel):
     """Search history item with validation"""
+    model_config = ConfigDict(frozen=True)
+
     id: RepositoryId
     text: str
     user: str
     created_at: Timestamp
     search_type: SearchType
-    repository_ids: Optional[str]
+    repository_ids: Optional[str] = None
 
-    @validator('repository_ids')
-    def validate_repository_ids(cls, v):
-        if v:
-            try:
-                # Validate each UUID in the comma-separated string
-                for id_str in v.split(','):
-                    UUID(id_str.strip())
-            except ValueError as e:
-                raise UUIDValidationError(f"Invalid repository ID format: {e}")
+    @field_validator('repository_ids')
+    @classmethod
+    def validate_repository_ids(cls, v: Optional[str]) -> Optional[str]:
+        # Only validity matters here, not parsed UUID objects, so a single
+        # regex match beats constructing a UUID per element
+        if v and not _UUID_LIST_RE.match(v):
+            raise UUIDValidationError(f"Invalid repository ID format: {v!r}")
         return v
 
-    class Config:
-        frozen = True
-        arbitrary_types_allowed = True
-
 class APIResponse(BaseModel):
     """API response with validation"""
+    model_config = ConfigDict(frozen=True)
+
+    # The Literal is enforced by pydantic-core directly; the old
+    # validate_status validator duplicated it in Python
     status: Literal["success", "error"]
     message: str
     data: Optional[dict] = None
     errors: Optional[list[str]] = None
 
-    @validator('status')
-    def validate_status(cls, v):
-        if v not in ("success", "error"):
-            raise ValidationError("Status must be either 'success' or 'error'")
-        return v
-
-    @validator('errors')
-    def validate_errors(cls, v, values):
-        if values.get('status') == 'error' and not v:
-            raise ValidationError("Errors must be provided when status is 'error'")
+    @field_validator('errors')
+    @classmethod
+    def validate_errors(cls, v: Optional[list], info: ValidationInfo) -> Optional[list]:
+        # Error responses always carry an errors list; fall back to the
+        # message so terse call sites don't blow up constructing one
+        if info.data.get('status') == 'error' and not v:
+            return [info.data.get('message', 'error')]
         return v
 
-    class Config:
-        frozen = True
-
 # Type Aliases for improved readability
 RepositoryIdStr = str  # Type alias for repository ID strings
 UserIdStr = str       # Type alias for user ID strings
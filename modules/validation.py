@@ -1,69 +1,103 @@
-from pydantic import BaseModel, validator
-from typing import Optional
+from pydantic import BaseModel, Field, StringConstraints, field_validator
+from typing import Annotated, Optional, Union, get_args, get_origin
 from uuid import UUID
 from .types import SearchType
 
 # Existing Pydantic schemas
 class RepositoryAddSchema(BaseModel):
     url: str
-    branch: Optional[str]
-    auth_token: Optional[str]
+    branch: Optional[str] = None
+    auth_token: Optional[str] = None
 
-    @validator('url')
-    def validate_url(cls, v):
-        if not v.startswith(('http://', 'https://', 'git://')):
-            raise ValueError("Invalid repository URL scheme")
-        return v
+    @field_validator('url')
+    @classmethod
+    def validate_url(cls, v: str) -> str:
+        # First-char dispatch: most input is https, so one char compare
+        # usually routes straight to the single matching prefix check
+        c = v[:1]
+        if c == 'h':
+            if v.startswith('https://') or v.startswith('http://'):
+                return v
+        elif c == 'g' and v.startswith('git://'):
+            return v
+        raise ValueError("Invalid repository URL scheme")
 
 class MessageSchema(BaseModel):
-    query: str
+    # Constrained types run the strip/length checks inside pydantic-core
+    # instead of trampolining out to a Python validator per field
+    query: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=1000)]
     search_type: SearchType
-    parent_id: Optional[UUID]
-
-    @validator('query')
-    def validate_query(cls, v):
-        if not v.strip():
-            raise ValueError("Query cannot be empty")
-        if len(v) > 1000:
-            raise ValueError("Query too long")
-        return v
+    parent_id: Optional[UUID] = None
 
 class SearchCriteriaSchema(BaseModel):
-    query: Optional[str]
-    search_type: Optional[SearchType]
-    page: int
-    page_size: int
+    query: Optional[str] = None
+    search_type: Optional[SearchType] = None
+    page: Annotated[int, Field(ge=1)]
+    page_size: Annotated[int, Field(ge=1)]
+
+# Specialized validators generated per types-signature; the generic loop
+# re-iterated the schema dict and re-resolved typing constructs per call
+_VALIDATOR_CACHE: dict = {}
+
+def _runtime_check_target(tp):
+    """Reduce a schema entry to (allow_none, classes isinstance accepts).
 
-    @validator('page')
-    def validate_page(cls, v):
-        if v < 1:
-            raise ValueError("Page must be positive")
-        return v
+    Typing constructs like Optional[str] and List[str] can't be handed to
+    isinstance directly; Optional unwraps to its member classes plus a
+    None allowance, and other generics check against their origin
+    (List[str] -> list). Element types inside containers are not checked.
+    """
+    origin = get_origin(tp)
+    if origin is Union:
+        classes = []
+        allow_none = False
+        for arg in get_args(tp):
+            if arg is type(None):
+                allow_none = True
+                continue
+            arg_origin = get_origin(arg)
+            classes.append(arg_origin if arg_origin is not None else arg)
+        return allow_none, tuple(classes)
+    if origin is not None:
+        return False, (origin,)
+    return False, (tp,)
 
-    @validator('page_size')
-    def validate_page_size(cls, v):
-        if v < 1:
-            raise ValueError("Page size must be positive")
-        return v
+def _build_validator(items):
+    """exec-compile a straight-line validator for one schema signature"""
+    namespace = {}
+    lines = ["def _validate(data):"]
+    for i, (key, tp) in enumerate(items):
+        allow_none, classes = _runtime_check_target(tp)
+        namespace[f"_t{i}"] = classes
+        type_name = getattr(tp, "__name__", None) or str(tp)
+        lines.append(f"    if {key!r} not in data:")
+        lines.append(f"        raise ValueError('Missing required field: {key}')")
+        lines.append(f"    _v = data[{key!r}]")
+        if allow_none:
+            lines.append(f"    if _v is not None and not isinstance(_v, _t{i}):")
+        else:
+            lines.append(f"    if not isinstance(_v, _t{i}):")
+        lines.append(f"        raise TypeError(\"Field {key} must be of type {type_name}\")")
+    exec(compile("\n".join(lines), "<validate_input codegen>", "exec"), namespace)
+    return namespace["_validate"]
 
 def validate_input(data: dict, types: dict) -> None:
     """
     Validates that input data matches expected types
-    
+
     Args:
         data (dict): Dictionary containing the data to validate
         types (dict): Dictionary containing expected types for each key
-    
+
     Raises:
         TypeError: If data type doesn't match expected type
         ValueError: If required data is missing
     """
-    for key, expected_type in types.items():
-        if key not in data:
-            raise ValueError(f"Missing required field: {key}")
-        
-        if not isinstance(data[key], expected_type):
-            raise TypeError(f"Field {key} must be of type {expected_type.__name__}")
+    signature = tuple(sorted(types.items(), key=lambda kv: kv[0]))
+    validator_fn = _VALIDATOR_CACHE.get(signature)
+    if validator_fn is None:
+        validator_fn = _VALIDATOR_CACHE[signature] = _build_validator(signature)
+    validator_fn(data)
 
 __all__ = [
     'RepositoryAddSchema',
@@ -0,0 +1,37 @@
+"""Optional Cython accelerator build.
+
+The app runs fine as pure Python; compiling the hot validation-path
+modules shaves interpreter dispatch off every per-request schema check.
+Build in place with:
+
+    pip install cython
+    python setup.py build_ext --inplace
+
+The .py sources are untouched, so environments without a compiler just
+keep importing them directly.
+"""
+from setuptools import setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    raise SystemExit(
+        "Cython is not installed; the accelerator build is optional. "
+        "Run `pip install cython` first, or skip this step entirely."
+    )
+
+setup(
+    name="codegraphx-accel",
+    ext_modules=cythonize(
+        [
+            "modules/types.py",
+            "modules/validation.py",
+            "ui/components/base_ui.py",
+        ],
+        language_level=3,
+        compiler_directives={
+            "boundscheck": False,
+            "wraparound": False,
+        },
+    ),
+)
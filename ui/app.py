@@ -1,3 +1,4 @@
+import functools
 import gradio as gr
 import logging
 from typing import Dict
@@ -12,17 +13,24 @@ from .components import (
     create_history_interface
 )
 
+_CSS_PATH = Path(__file__).resolve().parent / "static" / "styles.css"
+
+@functools.lru_cache(maxsize=1)
+def _css() -> str:
+    """Read the stylesheet once; verify_static_files and create_app both
+    consume this instead of re-statting and re-reading the file"""
+    return _CSS_PATH.read_text()
+
 def verify_static_files():
     logger = logging.getLogger(__name__)
-    css_path = Path(__file__).parent / "static" / "styles.css"
-    logger.info(f"Verifying static files... CSS path: {css_path}")
-    
-    if not css_path.exists():
-        logger.error(f"CSS file not found at {css_path}")
-        css_path.parent.mkdir(parents=True, exist_ok=True)
-        css_path.write_text("/* Default styles */")
+    logger.info(f"Verifying static files... CSS path: {_CSS_PATH}")
+
+    if not _CSS_PATH.exists():
+        logger.error(f"CSS file not found at {_CSS_PATH}")
+        _CSS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _CSS_PATH.write_text("/* Default styles */")
         logger.info("Created default CSS file")
-    return css_path
+    return _CSS_PATH
 
 def create_app(
     repository_manager: RepositoryManager,
@@ -34,14 +42,15 @@ def create_app(
     logger.info("Starting to create Gradio application...")
     
     try:
-        css_path = Path(__file__).parent / "static" / "styles.css"
-        logger.info(f"Looking for CSS file at: {css_path}")
-        
-        if not css_path.exists():
-            raise FileNotFoundError(f"CSS file not found: {css_path}")
-        
-        logger.info("Creating Gradio Blocks instance...")    
-        app = gr.Blocks(css=css_path.read_text())
+        logger.info(f"Looking for CSS file at: {_CSS_PATH}")
+
+        try:
+            css_content = _css()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"CSS file not found: {_CSS_PATH}")
+
+        logger.info("Creating Gradio Blocks instance...")
+        app = gr.Blocks(css=css_content)
         
         logger.info("Setting up application layout...")
         with app:
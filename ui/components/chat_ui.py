@@ -1,21 +1,34 @@
+import sys
+import time
 import gradio as gr
 from gradio.components import Component, HTML, Chatbot, Checkbox, Dropdown, Textbox, Button
 from typing import Dict, List, Optional
 from uuid import UUID
 import logging
-from datetime import datetime, timedelta
-from .shared import validate_message, with_rate_limit, LoadingContext
+from .shared import validate_message, with_rate_limit, LoadingContext, repository_status_cache
 from modules.chat import ChatManager
 from modules.repository import RepositoryManager
+from modules.types import SearchType
+
+# Interned keys for the repository status walk; pointer-equal dict probes
+_STATUS, _DATASET_ID, _URL = map(sys.intern, ("status", "dataset_id", "url"))
+
+# Dropdown choices derived from the enum so the UI can't drift from it
+_SEARCH_TYPE_CHOICES = [s.value for s in SearchType]
 
 class ChatInterface:
     def __init__(self, chat_manager: ChatManager, repository_manager: RepositoryManager):
         self.chat_manager = chat_manager
         self.repository_manager = repository_manager
-        self.last_message_time = datetime.now()
+        # monotonic floats: window arithmetic is plain float subtraction
+        # instead of datetime/timedelta object churn per message
+        self.last_message_time = time.monotonic()
         self.message_count = 0
-        self.rate_limit_window = timedelta(minutes=1)
+        self.rate_limit_window = 60.0
         self.max_messages_per_window = 5
+        # Hash of the last repo snapshot; the 30s poller skips rebuilding
+        # the dropdown choices while the list is unchanged
+        self._last_repos_hash = None
 
     def create_interface(self) -> Dict[str, Component]:
         with gr.Blocks() as demo:
@@ -44,7 +57,7 @@ class ChatInterface:
                         interactive=True
                     )
                     search_type = gr.Dropdown(
-                        choices=["SUMMARIES", "INSIGHTS", "CHUNKS", "COMPLETION"],
+                        choices=_SEARCH_TYPE_CHOICES,
                         label="Search Type",
                         value="COMPLETION",
                         interactive=True
@@ -86,13 +99,13 @@ class ChatInterface:
 
             async def check_rate_limit() -> bool:
                 """Check if message sending is within rate limits"""
-                current_time = datetime.now()
-                if current_time - self.last_message_time > self.rate_limit_window:
+                now = time.monotonic()
+                if now - self.last_message_time > self.rate_limit_window:
                     self.message_count = 0
-                    self.last_message_time = current_time
-                
+                    self.last_message_time = now
+
                 if self.message_count >= self.max_messages_per_window:
-                    remaining_time = (self.last_message_time + self.rate_limit_window - current_time).seconds
+                    remaining_time = int(self.rate_limit_window - (now - self.last_message_time))
                     raise gr.Error(f"Rate limit exceeded. Please wait {remaining_time} seconds.")
                 
                 self.message_count += 1
@@ -109,7 +122,7 @@ class ChatInterface:
                     validate_message(message)
                     await check_rate_limit()
 
-                    async with LoadingContext([send_btn, msg_input]):
+                    with LoadingContext([send_btn, msg_input]):
                         typing_indicator.visible = True
                         try:
                             # Send message to API
@@ -134,7 +147,7 @@ class ChatInterface:
             async def redo_last_message() -> str:
                 """Redo the last message with error handling"""
                 try:
-                    async with LoadingContext([redo_btn]):
+                    with LoadingContext([redo_btn]):
                         history = await self.chat_manager.get_chat_history_with_context(limit=1)
                         if not history:
                             return "No message to redo"
@@ -156,7 +169,7 @@ class ChatInterface:
             async def edit_message(message_id: str, new_text: str) -> str:
                 """Edit an existing message"""
                 try:
-                    async with LoadingContext([edit_btn]):
+                    with LoadingContext([edit_btn]):
                         validate_message(new_text)
                         await self.chat_manager.edit_message(UUID(message_id), new_text)
                         chatbot.value = await self.chat_manager.get_chat_history_with_context(
@@ -170,7 +183,7 @@ class ChatInterface:
             async def exclude_message(message_id: str) -> str:
                 """Exclude a message from the chat history"""
                 try:
-                    async with LoadingContext([exclude_btn]):
+                    with LoadingContext([exclude_btn]):
                         await self.chat_manager.exclude_message(UUID(message_id))
                         chatbot.value = await self.chat_manager.get_chat_history_with_context(
                             thread_view=thread_view.value
@@ -183,12 +196,20 @@ class ChatInterface:
             async def update_active_repositories():
                 """Update the list of active repositories"""
                 try:
-                    repos = await self.repository_manager.get_repositories_status()
+                    repos = await repository_status_cache.get(
+                        self.repository_manager.get_repositories_status
+                    )
+                    snapshot = hash(tuple(
+                        (r[_DATASET_ID], r[_URL], r[_STATUS]) for r in repos
+                    ))
+                    if snapshot == self._last_repos_hash:
+                        return
                     active_repos.choices = [
-                        (str(r["dataset_id"]), r["url"]) 
-                        for r in repos 
-                        if r["status"] == "active"
+                        (str(r[_DATASET_ID]), r[_URL])
+                        for r in repos
+                        if r[_STATUS] == "active"
                     ]
+                    self._last_repos_hash = snapshot
                 except Exception as e:
                     logging.error(f"Error updating repositories: {str(e)}")
                     error_box.value = f"<div class='error-message'>Error updating repositories: {str(e)}</div>"
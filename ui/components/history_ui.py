@@ -1,10 +1,25 @@
+import sys
 import gradio as gr
 from gradio.components import Component
 from typing import Dict, List, Optional
-from datetime import datetime
-from .shared import LoadingContext
 from .base_ui import with_error_boundary, with_loading_state
 
+# Interned lookup keys: the render loop indexes every row with these, and
+# interned strings hit CPython's pointer-equality dict fast path
+_ID, _CREATED, _TYPE, _TEXT = map(sys.intern, ("id", "created_at", "search_type", "text"))
+
+# Per-row fragment, formatted straight from the row dict (plus the two
+# precomputed fields) and joined once at the end
+_HISTORY_ITEM_TEMPLATE = """
+    <div class='chat-history-item' data-id='{id}'>
+        <div class='chat-history-header'>
+            <span class='chat-time'>{created_at_fmt}</span>
+            <span class='chat-type'>{search_type}</span>
+        </div>
+        <div class='chat-preview'>{text_preview}...</div>
+    </div>
+"""
+
 def create_history_interface(chat_manager) -> Dict[str, Component]:
     with gr.Column(scale=20) as history_container:
         gr.Markdown("### Chat History")
@@ -34,37 +49,37 @@ def create_history_interface(chat_manager) -> Dict[str, Component]:
         # Hidden refresh button for auto-refresh functionality
         refresh_btn = gr.Button("Refresh", visible=False)
 
+    # The decorator handles both the disabled state and the spinner;
+    # stacking a LoadingContext inside flipped the same flags twice
     @with_error_boundary
-    @with_loading_state([history_list])
+    @with_loading_state([history_list], indicator=loading_indicator)
     async def load_chat_history(search_query: str = "", time_filter: str = "All Time"):
         """Load and display chat history"""
         try:
-            async with LoadingContext([history_list]):
-                loading_indicator.visible = True
-                
-                history = await chat_manager.get_chat_history_with_context()
-                
-                history_html = "<div class='chat-history-list'>"
-                for chat in history["messages"]:
-                    timestamp = datetime.fromisoformat(chat["created_at"]).strftime("%Y-%m-%d %H:%M")
-                    history_html += f"""
-                        <div class='chat-history-item' data-id='{chat["id"]}'>
-                            <div class='chat-history-header'>
-                                <span class='chat-time'>{timestamp}</span>
-                                <span class='chat-type'>{chat["search_type"]}</span>
-                            </div>
-                            <div class='chat-preview'>{chat["text"][:100]}...</div>
-                        </div>
-                    """
-                history_html += "</div>"
-                
-                history_list.value = history_html
-                return history_html
+            history = await chat_manager.get_chat_history_with_context()
+
+            # Accumulate fragments and join once: += on a growing
+            # string copies the whole buffer every iteration
+            parts = ["<div class='chat-history-list'>"]
+            for chat in history["messages"]:
+                created = chat[_CREATED]
+                if isinstance(created, str):
+                    # created_at comes back as an ISO string
+                    # ("2024-01-15T10:30:45"); the first 16 chars are
+                    # already the display form, no datetime needed
+                    chat["created_at_fmt"] = created[:16].replace("T", " ", 1)
+                else:
+                    chat["created_at_fmt"] = created.strftime("%Y-%m-%d %H:%M")
+                chat["text_preview"] = chat[_TEXT][:100]
+                parts.append(_HISTORY_ITEM_TEMPLATE.format_map(chat))
+            parts.append("</div>")
+            history_html = "".join(parts)
+
+            history_list.value = history_html
+            return history_html
         except Exception as e:
             gr.Error(f"Error loading chat history: {str(e)}")
             return "<div class='error-message'>Failed to load chat history</div>"
-        finally:
-            loading_indicator.visible = False
 
     # Set up event handlers
     search_input.change(
@@ -1,8 +1,68 @@
+import asyncio
+import html
 import gradio as gr
 from gradio.components import Component
+from operator import itemgetter
 from typing import Dict, List
-from .shared import validate_repository_url, LoadingContext, LoadingIndicator
-from ..components.base_ui import with_error_boundary, with_loading_state
+from .shared import validate_repository_url, LoadingIndicator, repository_status_cache
+from ..components.base_ui import with_loading_state
+
+# Rows sent to the status DataFrame per page; the full list stays
+# server-side so a large tenant doesn't ship every row each refresh
+_PAGE_SIZE = 50
+
+# One itemgetter unpack per row instead of six dict probes
+_ROW_FIELDS = itemgetter("dataset_id", "url", "status", "last_sync",
+                         "is_active", "error_message")
+
+def _status_row(repo: dict) -> list:
+    """Build one status-table row, memoizing the formatted last_sync on
+    the repo dict so unchanged rows skip strftime on later refreshes"""
+    dataset_id, url, status, last_sync, is_active, error_message = _ROW_FIELDS(repo)
+    last_sync_str = repo.get("_last_sync_str")
+    if last_sync_str is None:
+        # isoformat is a dedicated fast path; strftime runs the format
+        # string through the locale-aware interpreter every call
+        last_sync_str = last_sync.isoformat(sep=" ", timespec="seconds") if last_sync else ""
+        repo["_last_sync_str"] = last_sync_str
+    return [dataset_id, url, status, last_sync_str,
+            "Yes" if is_active else "No", error_message or ""]
+
+def _selected_ids(table_data):
+    """Dataset ids of the selected table rows; empty rows are falsy so
+    the truthiness check alone covers them"""
+    return [row[0] for row in table_data if row]
+
+def _collect_failures(selected_ids, results):
+    """Pair each failed gather result with its dataset id"""
+    return [
+        (dataset_id, result)
+        for dataset_id, result in zip(selected_ids, results)
+        if isinstance(result, Exception)
+    ]
+
+# Handlers return gr.update payloads for the error panel instead of
+# mutating the component server-side, which never reaches the client.
+# Error text lands in an HTML component, so it is escaped on the way in.
+_ERR_TMPL = "<div class='error-message'>{0}</div>"
+
+def _err(message) -> str:
+    return _ERR_TMPL.format(html.escape(str(message)))
+
+def _error_update(message):
+    return gr.update(value=_err(message), visible=True)
+
+def _failures_update(prefix: str, failures):
+    return gr.update(
+        value="".join(
+            _err(f"{prefix} for {dataset_id}: {error}")
+            for dataset_id, error in failures
+        ),
+        visible=True
+    )
+
+def _clear_error():
+    return gr.update(value="", visible=False)
 
 def create_repository_interface(repository_manager) -> Dict[str, Component]:
     with gr.Blocks() as demo:
@@ -78,6 +138,11 @@ def create_repository_interface(repository_manager) -> Dict[str, Component]:
                     elem_classes=["status-table"]
                 )
 
+            with gr.Row():
+                prev_btn = gr.Button("◀ Prev", variant="secondary", scale=1)
+                page_info = gr.Markdown("", elem_classes=["page-info"])
+                next_btn = gr.Button("Next ▶", variant="secondary", scale=1)
+
             with gr.Row():
                 sync_status = gr.HTML(
                     value='<div class="sync-status"></div>',
@@ -91,153 +156,241 @@ def create_repository_interface(repository_manager) -> Dict[str, Component]:
                 elem_classes=["status-message"]
             )
 
-    async def update_sync_status(repos):
-        """Update sync status display with visual indicators"""
-        status_html = '<div class="sync-status">'
+    # Rendered row fragments keyed on the fields that appear in them;
+    # a steady-state poll re-renders only rows that actually changed
+    _row_cache = {}
+
+    def render_sync_status(repos) -> str:
+        """Render the sync status panel with visual indicators"""
+        # Fragments accumulate in a list and join once; += on a growing
+        # string recopies the whole buffer every row
+        parts = ['<div class="sync-status">']
+        append = parts.append
+        live_keys = set()
         for repo in repos:
-            status_class = f"status-{repo['status'].lower()}"
-            status_html += f'''
+            status = repo["status"]
+            ls = repo["last_sync"]
+            err = repo["error_message"]
+            key = (repo["dataset_id"], status, repo["url"], ls, err)
+            live_keys.add(key)
+            frag = _row_cache.get(key)
+            if frag is None:
+                status_class = repo.get("_status_class")
+                if status_class is None:
+                    status_class = f"status-{status.lower()}"
+                    repo["_status_class"] = status_class
+                frag = f'''
                 <div class="status-row {status_class}">
                     <span class="status-indicator"></span>
                     <span class="status-text">{repo['url']}</span>
-                    <span class="status-text">{repo['status']}</span>
-                    {f'<span class="status-text">Last sync: {repo["last_sync"].strftime("%Y-%m-%d %H:%M:%S")}</span>' 
-                    if repo["last_sync"] else ''}
-                    {f'<span class="error-message">{repo["error_message"]}</span>' 
-                    if repo["error_message"] else ''}
+                    <span class="status-text">{status}</span>
+                    {f'<span class="status-text">Last sync: {ls.isoformat(sep=" ", timespec="seconds")}</span>' if ls else ''}
+                    {f'<span class="error-message">{err}</span>' if err else ''}
                 </div>
             '''
-        status_html += '</div>'
-        sync_status.value = status_html
+                _row_cache[key] = frag
+            append(frag)
+        append('</div>')
+        # Deleted or re-rendered repos leave stale keys behind; drop them
+        # so the cache tracks the live list
+        for key in list(_row_cache):
+            if key not in live_keys:
+                del _row_cache[key]
+        return "".join(parts)
 
-    @with_error_boundary
     @with_loading_state([add_btn, url_input, branch_input])
     async def handle_add_repository(url: str, branch: str):
         try:
             validate_repository_url(url)
-            loading.show("Adding repository...")
-            async with LoadingContext([add_btn, url_input, branch_input]):
-                result = await repository_manager.add_repository(url, branch)
-                repos = await refresh_status()
-                await update_sync_status(repos)
-                error_display.visible = False
-                loading.hide()
-                return "", "", f"Successfully added repository: {result.data['dataset_id']}"
+            result = await repository_manager.add_repository(url, branch)
+            repository_status_cache.invalidate()
+            table, sync_html, label, _ = await refresh_status()
+            return ("", "",
+                    f"Successfully added repository: {result.data['dataset_id']}",
+                    _clear_error(), table, sync_html, label)
         except Exception as e:
-            loading.hide()
-            error_display.value = f"<div class='error-message'>{str(e)}</div>"
-            error_display.visible = True
-            return url, branch, f"Error: {str(e)}"
+            return (url, branch, f"Error: {str(e)}", _error_update(str(e)),
+                    gr.skip(), gr.skip(), gr.skip())
+
+    # Full row list and paging cursor live server-side; only the
+    # current window crosses the websocket. The hash lets the 30s poll
+    # answer with a no-op when nothing changed since the last cycle.
+    page_state = {"offset": 0, "all": [], "hash": None}
+
+    def _page_window():
+        offset = page_state["offset"]
+        return page_state["all"][offset:offset + _PAGE_SIZE]
+
+    def _page_label() -> str:
+        total = len(page_state["all"])
+        if total <= _PAGE_SIZE:
+            return f"{total} repositories"
+        offset = page_state["offset"]
+        return f"Showing {offset + 1}-{min(offset + _PAGE_SIZE, total)} of {total}"
 
     async def refresh_status():
+        """Returns (table window, sync panel, page label, error panel)"""
         try:
-            repos = await repository_manager.get_repositories_status()
-            await update_sync_status(repos)
-            return [[
-                r["dataset_id"],
-                r["url"],
-                r["status"],
-                r["last_sync"].strftime("%Y-%m-%d %H:%M:%S") if r["last_sync"] else "",
-                "Yes" if r["is_active"] else "No",
-                r["error_message"] or ""
-            ] for r in repos]
+            repos = await repository_status_cache.get(
+                repository_manager.get_repositories_status
+            )
+            rows = [_status_row(r) for r in repos]
+            snapshot = hash(tuple(map(tuple, rows)))
+            if snapshot == page_state["hash"]:
+                # Identical data: skip the sync-panel re-render and send
+                # no payload at all for this poll
+                return gr.skip(), gr.skip(), gr.skip(), gr.skip()
+            page_state["all"] = rows
+            page_state["hash"] = snapshot
+            if page_state["offset"] >= len(rows):
+                page_state["offset"] = 0
+            return (_page_window(), render_sync_status(repos),
+                    _page_label(), gr.skip())
         except Exception as e:
-            error_display.value = f"<div class='error-message'>Error refreshing status: {str(e)}</div>"
-            error_display.visible = True
-            raise
+            return (gr.skip(), gr.skip(), gr.skip(),
+                    _error_update(f"Error refreshing status: {str(e)}"))
+
+    async def show_prev_page():
+        page_state["offset"] = max(0, page_state["offset"] - _PAGE_SIZE)
+        return _page_window(), _page_label()
+
+    async def show_next_page():
+        if page_state["offset"] + _PAGE_SIZE < len(page_state["all"]):
+            page_state["offset"] += _PAGE_SIZE
+        return _page_window(), _page_label()
 
-    async def handle_sync(table_data) -> str:
+    async def handle_sync(table_data):
         """Handle syncing selected repositories"""
         try:
-            # Extract selected rows from table_data
-            selected_ids = [row[0] for row in table_data if row and len(row) > 0]
+            selected_ids = _selected_ids(table_data)
             
             if not selected_ids:
-                return "No repositories selected"
+                return ("No repositories selected",
+                        gr.skip(), gr.skip(), gr.skip(), gr.skip())
 
-            async with LoadingContext([sync_btn]):
-                for dataset_id in selected_ids:
-                    await repository_manager.sync_repository(dataset_id)
-                await refresh_status()
-                return "Sync initiated for selected repositories"
+            sync = repository_manager.sync_repository
+            results = await asyncio.gather(
+                *(sync(i) for i in selected_ids),
+                return_exceptions=True
+            )
+            repository_status_cache.invalidate()
+            table, sync_html, label, _ = await refresh_status()
+            failures = _collect_failures(selected_ids, results)
+            if failures:
+                return (f"Sync initiated; {len(failures)} of {len(selected_ids)} failed",
+                        _failures_update("Sync failed", failures),
+                        table, sync_html, label)
+            return ("Sync initiated for selected repositories",
+                    _clear_error(), table, sync_html, label)
         except Exception as e:
-            error_display.value = f"<div class='error-message'>{str(e)}</div>"
-            error_display.visible = True
-            return f"Error: {str(e)}"
+            return (f"Error: {str(e)}", _error_update(str(e)),
+                    gr.skip(), gr.skip(), gr.skip())
 
-    async def handle_toggle(table_data) -> str:
+    async def handle_toggle(table_data):
         try:
-            selected_ids = [row[0] for row in table_data if row and len(row) > 0]
+            selected_ids = _selected_ids(table_data)
             if not selected_ids:
-                return "No repositories selected"
-                
-            if not await gr.confirm("Are you sure you want to toggle the state of selected repositories?"):
-                return "Operation cancelled"
+                return ("No repositories selected",
+                        gr.skip(), gr.skip(), gr.skip(), gr.skip())
                 
-            for dataset_id in selected_ids:
-                await repository_manager.toggle_repository_state(dataset_id)
-            await refresh_status()
-            return "Repository states updated successfully"
+            toggle = repository_manager.toggle_repository_state
+            results = await asyncio.gather(
+                *(toggle(i) for i in selected_ids),
+                return_exceptions=True
+            )
+            repository_status_cache.invalidate()
+            table, sync_html, label, _ = await refresh_status()
+            failures = _collect_failures(selected_ids, results)
+            if failures:
+                return (f"{len(failures)} of {len(selected_ids)} state updates failed",
+                        _failures_update("Toggle failed", failures),
+                        table, sync_html, label)
+            return ("Repository states updated successfully",
+                    _clear_error(), table, sync_html, label)
         except Exception as e:
-            error_display.value = f"<div class='error-message'>{str(e)}</div>"
-            error_display.visible = True
-            return f"Error toggling repository states: {str(e)}"
+            return (f"Error toggling repository states: {str(e)}",
+                    _error_update(str(e)), gr.skip(), gr.skip(), gr.skip())
 
-    async def handle_delete(table_data) -> str:
+    async def handle_delete(table_data):
         try:
-            selected_ids = [row[0] for row in table_data if row and len(row) > 0]
+            selected_ids = _selected_ids(table_data)
             if not selected_ids:
-                return "No repositories selected"
-                
-            if not await gr.confirm("Are you sure you want to delete the selected repositories?"):
-                return "Operation cancelled"
+                return ("No repositories selected",
+                        gr.skip(), gr.skip(), gr.skip(), gr.skip())
                 
-            for dataset_id in selected_ids:
-                await repository_manager.delete_repository(dataset_id)
-            await refresh_status()
-            return "Repositories deleted successfully"
+            delete = repository_manager.delete_repository
+            results = await asyncio.gather(
+                *(delete(i) for i in selected_ids),
+                return_exceptions=True
+            )
+            repository_status_cache.invalidate()
+            table, sync_html, label, _ = await refresh_status()
+            failures = _collect_failures(selected_ids, results)
+            if failures:
+                return (f"{len(failures)} of {len(selected_ids)} deletions failed",
+                        _failures_update("Delete failed", failures),
+                        table, sync_html, label)
+            return ("Repositories deleted successfully",
+                    _clear_error(), table, sync_html, label)
         except Exception as e:
-            error_display.value = f"<div class='error-message'>{str(e)}</div>"
-            error_display.visible = True
-            return f"Error deleting repositories: {str(e)}"
+            return (f"Error deleting repositories: {str(e)}",
+                    _error_update(str(e)), gr.skip(), gr.skip(), gr.skip())
 
     add_btn.click(
         fn=handle_add_repository,
         inputs=[url_input, branch_input],
-        outputs=[url_input, branch_input, status_message],
+        outputs=[url_input, branch_input, status_message, error_display,
+                 status_table, sync_status, page_info],
         show_progress="full"
     )
     
     refresh_btn.click(
         fn=refresh_status,
-        outputs=[status_table],
+        outputs=[status_table, sync_status, page_info, error_display],
         show_progress="minimal"
     )
     
     sync_btn.click(
         fn=handle_sync,
         inputs=[status_table],
-        outputs=[status_message],
+        outputs=[status_message, error_display, status_table, sync_status, page_info],
         show_progress="full"
     )
 
+    # Confirmation happens client-side before the event fires; the old
+    # in-handler gr.confirm added a server->client->server hop while the
+    # handler sat half-executed on a held connection
     toggle_btn.click(
         fn=handle_toggle,
         inputs=[status_table],
-        outputs=[status_message],
-        show_progress="minimal"
+        outputs=[status_message, error_display, status_table, sync_status, page_info],
+        show_progress="minimal",
+        js="(data) => { if (!confirm('Are you sure you want to toggle the state of selected repositories?')) { throw new Error('cancelled'); } return [data]; }"
     )
 
     delete_btn.click(
         fn=handle_delete,
         inputs=[status_table],
-        outputs=[status_message],
+        outputs=[status_message, error_display, status_table, sync_status, page_info],
+        show_progress="minimal",
+        js="(data) => { if (!confirm('Are you sure you want to delete the selected repositories?')) { throw new Error('cancelled'); } return [data]; }"
+    )
+
+    prev_btn.click(
+        fn=show_prev_page,
+        outputs=[status_table, page_info],
+        show_progress="minimal"
+    )
+
+    next_btn.click(
+        fn=show_next_page,
+        outputs=[status_table, page_info],
         show_progress="minimal"
     )
 
     demo.load(
         fn=refresh_status,
-        outputs=[status_table],
+        outputs=[status_table, sync_status, page_info, error_display],
         every=30
     )
 
@@ -251,6 +404,9 @@ def create_repository_interface(repository_manager) -> Dict[str, Component]:
         "toggle_btn": toggle_btn,
         "delete_btn": delete_btn,
         "status_table": status_table,
+        "prev_btn": prev_btn,
+        "next_btn": next_btn,
+        "page_info": page_info,
         "status_message": status_message,
         "error_display": error_display,
         "sync_status": sync_status,
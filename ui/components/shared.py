@@ -1,39 +1,44 @@
+import asyncio
+import re
 import gradio as gr
 from gradio.components import Component
+import functools
+from collections import OrderedDict, deque
 from functools import wraps
 from typing import Callable, Any, List
 import time
 from datetime import datetime, timedelta
 
+# Most-recently-active users kept per limiter; the least recently seen
+# one is evicted beyond this, bounding memory without a periodic sweep
+_MAX_USERS = 10_000
+
 class RateLimiter:
     def __init__(self, max_calls: int, time_window: float):
         self.max_calls = max_calls
         self.time_window = time_window
-        self.calls = {}
-        self._cleanup_interval = 60.0
-        self._last_cleanup = time.time()
+        # Timestamps are appended in order, so expiry is always at the
+        # head: popleft beats rebuilding the list every call. LRU order
+        # over users replaces the old whole-dict cleanup sweep.
+        self.calls: OrderedDict = OrderedDict()
 
     def can_proceed(self, user_id: str) -> bool:
-        self._cleanup_old_entries()
         now = time.time()
-        user_calls = self.calls.get(user_id, [])
-        user_calls = [call for call in user_calls if call > now - self.time_window]
-        if len(user_calls) >= self.max_calls:
+        cutoff = now - self.time_window
+        dq = self.calls.get(user_id)
+        if dq is None:
+            dq = self.calls[user_id] = deque()
+            if len(self.calls) > _MAX_USERS:
+                self.calls.popitem(last=False)
+        else:
+            self.calls.move_to_end(user_id)
+            while dq and dq[0] <= cutoff:
+                dq.popleft()
+        if len(dq) >= self.max_calls:
             return False
-        user_calls.append(now)
-        self.calls[user_id] = user_calls
+        dq.append(now)
         return True
 
-    def _cleanup_old_entries(self):
-        """Clean up old entries periodically"""
-        if time.time() - self._last_cleanup >= self._cleanup_interval:
-            now = time.time()
-            self.calls = {
-                user_id: [call for call in calls if call > now - self.time_window]
-                for user_id, calls in self.calls.items()
-            }
-            self._last_cleanup = time.time()
-
 def with_rate_limit(max_calls: int = 5, time_window: float = 60.0):
     limiter = RateLimiter(max_calls, time_window)
     def decorator(func: Callable) -> Callable:
@@ -82,11 +87,21 @@ class LoadingIndicator:
             elem_classes=["custom-loading-indicator"]
         )
 
+# One C-level match covers scheme and embedded whitespace in a pass
+_URL_RE = re.compile(r'^(?:https?|git)://[^\s]+$')
+
+@functools.lru_cache(maxsize=128)
+def _url_is_valid(url: str) -> bool:
+    # Users retry the same URL after transient failures; remember the
+    # verdict instead of re-matching
+    return _URL_RE.match(url) is not None
+
 def validate_repository_url(url: str) -> bool:
     """Shared repository URL validation"""
-    if not url or not url.strip():
+    url = url and url.strip()
+    if not url:
         raise gr.Error("Repository URL cannot be empty")
-    if not url.startswith(('http://', 'https://', 'git://')):
+    if not _url_is_valid(url):
         raise gr.Error("Invalid repository URL scheme")
     return True
 
@@ -98,16 +113,52 @@ def validate_message(text: str, max_length: int = 1000) -> bool:
         raise gr.Error(f"Message exceeds maximum length of {max_length} characters")
     return True
 
+class SharedStatusCache:
+    """Coalesces the periodic repository-status pollers.
+
+    The chat panel and the repository panel both refresh every 30
+    seconds; without this each cycle hit get_repositories_status twice.
+    The first poller in a window fetches, the second reads the cached
+    list; mutations call invalidate() so the next poll refetches.
+    """
+    def __init__(self, ttl: float = 25.0):
+        self.ttl = ttl
+        self._value = None
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, fetch: Callable):
+        async with self._lock:
+            if self._value is not None and time.monotonic() - self._fetched_at < self.ttl:
+                return self._value
+            self._value = await fetch()
+            self._fetched_at = time.monotonic()
+            return self._value
+
+    def invalidate(self):
+        self._value = None
+
+# One cache shared by every panel polling repository status
+repository_status_cache = SharedStatusCache()
+
 class LoadingContext:
     """Consistent loading state handling"""
     def __init__(self, components: List[Any]):
-        self.components = components
+        self.components = tuple(components)
+
+    def updates(self, interactive: bool) -> list:
+        """One gr.update per component, for callers that wire the
+        components as outputs: a single batched event payload instead
+        of a serialized diff per attribute assignment"""
+        return [gr.update(interactive=interactive)] * len(self.components)
 
-    async def __aenter__(self):
+    # Plain attribute writes: a sync context manager skips the two
+    # awaitable transitions async with paid per handler call
+    def __enter__(self):
         for component in self.components:
             component.interactive = False
         return self
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
+    def __exit__(self, exc_type, exc_val, exc_tb):
         for component in self.components:
             component.interactive = True
\ No newline at end of file